@@ -6,7 +6,6 @@ Supports both research initiation and follow-up Q&A about completed research.
 """
 
 import asyncio
-import json
 import os
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -21,7 +20,7 @@ from claude_agent_sdk import (
     ToolUseBlock,
 )
 
-from web_research_agent import get_session_pdfs, get_session_report
+from web_research_agent import get_session_pdfs, get_session_report, write_session_json
 from web_research_tools import ResearchConfig, web_research_tools_server
 
 # =============================================================================
@@ -41,6 +40,7 @@ You can:
 
 - **arxiv_search**: Search ArXiv for academic papers (PREFERRED for CS, ML, AI, physics, math topics - guaranteed PDF access)
 - **web_search**: Search the broader web for research papers and academic articles
+- **multi_search**: Run web_search and arxiv_search for the same query at once
 - **download_pdfs**: Download PDF files from URLs
 - **read_pdf**: Extract and read text from downloaded PDFs
 - **save_note**: Save important findings and insights
@@ -54,7 +54,7 @@ You can:
   - You can filter by category (e.g., cs.AI, cs.LG, cs.CL, stat.ML)
   - Sort by relevance or date for latest papers
 - **Use web_search** for: biology, medicine, social sciences, or when you need broader coverage
-- **Combine both** for comprehensive research
+- **Combine both** for comprehensive research; multi_search runs both in one call
 
 ## Interaction Style
 
@@ -150,6 +150,32 @@ class ChatSession:
 # =============================================================================
 
 
+def build_followup_options(
+    research_session_path: str, model: str | None = None
+) -> ClaudeAgentOptions:
+    """
+    Build agent options for Q&A about a completed research session.
+
+    Reads the session's report and PDF list into the system prompt, so callers
+    answering several questions about one session can build this once and reuse it.
+    """
+    report = get_session_report(research_session_path) or "No report available."
+    pdfs = get_session_pdfs(research_session_path)
+    papers_list = "\n".join(f"- {pdf}" for pdf in pdfs) if pdfs else "No papers downloaded."
+
+    system_prompt = FOLLOWUP_CHAT_SYSTEM_PROMPT.format(
+        report_content=report[:10000],  # Limit to avoid context overflow
+        papers_list=papers_list,
+    )
+
+    # In followup mode, we don't need research tools
+    return ClaudeAgentOptions(
+        system_prompt=system_prompt,
+        permission_mode="bypassPermissions",
+        model=model,
+    )
+
+
 async def chat_with_agent(
     user_message: str,
     chat_history: list[dict],
@@ -157,7 +183,9 @@ async def chat_with_agent(
     research_session_path: str | None = None,
     on_tool_use: Callable[[str, dict], None] | None = None,
     model: str | None = None,
-    on_complete: Callable[[float, float], None] | None = None,
+    on_complete: Callable[[float, float, bool], None] | None = None,
+    options: ClaudeAgentOptions | None = None,
+    download_concurrency: int = 8,
 ) -> AsyncGenerator[str, None]:
     """
     Stream a chat response from the agent.
@@ -169,28 +197,18 @@ async def chat_with_agent(
         research_session_path: Path to research session for followup mode
         on_tool_use: Callback when a tool is used
         model: Model to use (e.g., "claude-sonnet-4-20250514")
-        on_complete: Callback when complete with (duration_ms, cost_usd)
+        on_complete: Callback when complete with (duration_ms, cost_usd, is_error);
+            is_error is set when the run stopped early, e.g. at the turn or budget limit
+        options: Prebuilt followup options (see build_followup_options); built if omitted
+        download_concurrency: How many PDFs research mode downloads at once
 
     Yields:
         Chunks of the assistant's response
     """
     # Build system prompt based on mode
     if mode == "followup" and research_session_path:
-        report = get_session_report(research_session_path) or "No report available."
-        pdfs = get_session_pdfs(research_session_path)
-        papers_list = "\n".join(f"- {pdf}" for pdf in pdfs) if pdfs else "No papers downloaded."
-
-        system_prompt = FOLLOWUP_CHAT_SYSTEM_PROMPT.format(
-            report_content=report[:10000],  # Limit to avoid context overflow
-            papers_list=papers_list,
-        )
-
-        # In followup mode, we don't need research tools
-        options = ClaudeAgentOptions(
-            system_prompt=system_prompt,
-            permission_mode="bypassPermissions",
-            model=model,
-        )
+        if options is None:
+            options = build_followup_options(research_session_path, model)
     else:
         # Research mode with tools
         if research_session_path:
@@ -198,6 +216,7 @@ async def chat_with_agent(
         else:
             # Create new session folder
             ResearchConfig.create_session_folder("chat_research", "research_sessions")
+        ResearchConfig.set_download_concurrency(download_concurrency)
 
         options = ClaudeAgentOptions(
             system_prompt=RESEARCH_CHAT_SYSTEM_PROMPT,
@@ -250,6 +269,9 @@ async def chat_with_agent(
                                 category = block.input.get("category", "")
                                 cat_str = f" [{category}]" if category else ""
                                 yield f"\n\n📚 *ArXiv Search{cat_str}: {query}...*\n\n"
+                            elif tool_name == "multi_search":
+                                query = block.input.get("query", "")[:50]
+                                yield f"\n\n🔍 *Searching web + ArXiv: {query}...*\n\n"
                             elif tool_name == "download_pdfs":
                                 count = len(block.input.get("urls", []))
                                 yield f"\n\n📥 *Downloading {count} PDFs...*\n\n"
@@ -269,7 +291,11 @@ async def chat_with_agent(
                         and hasattr(message, "duration_ms")
                         and hasattr(message, "total_cost_usd")
                     ):
-                        on_complete(message.duration_ms, message.total_cost_usd)
+                        on_complete(
+                            message.duration_ms,
+                            message.total_cost_usd,
+                            bool(getattr(message, "is_error", False)),
+                        )
 
     except Exception as e:
         import traceback
@@ -341,8 +367,7 @@ async def quick_research_chat(
         "mode": "chat",
         "created_at": datetime.now().isoformat(),
     }
-    with open(os.path.join(session_dir, "metadata.json"), "w") as f:
-        json.dump(metadata, f, indent=2)
+    write_session_json(os.path.join(session_dir, "metadata.json"), metadata)
 
     depth_instructions = {
         "quick": "Do a quick search, find 2-3 key papers, and summarize the main points.",
@@ -360,7 +385,7 @@ Start by searching for relevant papers, then download and analyze them. Share yo
     tool_count = {"searches": 0, "downloads": 0, "reads": 0, "notes": 0, "report": False}
 
     def on_tool(name, input_data):
-        if name == "web_search":
+        if name in ("web_search", "multi_search"):
             tool_count["searches"] += 1
         elif name == "download_pdfs":
             tool_count["downloads"] += len(input_data.get("urls", []))
@@ -387,8 +412,7 @@ Start by searching for relevant papers, then download and analyze them. Share yo
         "completed_at": datetime.now().isoformat(),
         "stats": tool_count,
     }
-    with open(os.path.join(session_dir, "completion.json"), "w") as f:
-        json.dump(completion, f, indent=2)
+    write_session_json(os.path.join(session_dir, "completion.json"), completion)
 
     return {
         "session_dir": session_dir,
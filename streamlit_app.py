@@ -21,26 +21,55 @@ if npm_path not in os.environ.get("PATH", ""):
 
 import asyncio
 import base64
+import copy
+import functools
+import hashlib
 import json
+import mmap
 import random
 import shutil
-import traceback
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import quote
 
 import streamlit as st
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # Optional; stdlib json is the fallback
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # Optional, and unavailable on Windows
+    uvloop = None
+
 load_dotenv()
 
-from chat_research_agent import chat_with_agent
+from chat_research_agent import build_followup_options, chat_with_agent
+from email_service import EmailConfig, send_email_report
 from web_research_agent import (
     ResearchRequest,
-    get_pdf_path,
     get_session_pdfs,
     get_session_report,
     list_research_sessions,
     run_web_research,
+    write_session_json,
 )
+from web_research_tools import NOTES_FILENAME, ResearchConfig, count_notes, load_notes
+
+# Pick the event loop once per process; reruns see the policy is already in place.
+# The Claude CLI runs as a subprocess, which needs the Proactor loop on Windows;
+# elsewhere every new loop (background or asyncio.run) uses uvloop when installed.
+if sys.platform == "win32":
+    if not isinstance(asyncio.get_event_loop_policy(), asyncio.WindowsProactorEventLoopPolicy):
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+elif uvloop is not None and not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 # =============================================================================
 # Page Configuration
@@ -53,191 +82,140 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+SESSIONS_DIR = "research_sessions"
+# Served at app/static/ when server.enableStaticServing is on (.streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
 # Custom CSS - Enhanced UI
-st.markdown(
-    """
-<style>
-    /* Main container */
-    .main .block-container {
-        padding-top: 1.5rem;
-        padding-bottom: 2rem;
-        max-width: 1200px;
-    }
-
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-    }
-
-    [data-testid="stSidebar"] .stButton > button {
-        transition: all 0.2s ease;
-    }
-
-    [data-testid="stSidebar"] .stButton > button:hover {
-        transform: translateX(3px);
-        box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3);
-    }
-
-    /* Main header */
-    .main-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1.5rem 2rem;
-        border-radius: 16px;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 4px 20px rgba(102, 126, 234, 0.3);
-    }
-
-    .main-header h1 {
-        margin: 0;
-        font-size: 1.8rem;
-        font-weight: 700;
-    }
-
-    .main-header p {
-        margin: 0.5rem 0 0 0;
-        opacity: 0.9;
-        font-size: 0.95rem;
-    }
-
-    /* Metrics styling */
-    [data-testid="stMetric"] {
-        background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
-        padding: 1rem;
-        border-radius: 12px;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-
-    [data-testid="stMetric"] label {
-        color: #666;
-        font-size: 0.85rem;
-    }
-
-    [data-testid="stMetric"] [data-testid="stMetricValue"] {
-        color: #667eea;
-        font-weight: 600;
-    }
-
-    /* Chat messages */
-    .stChatMessage {
-        border-radius: 16px;
-        box-shadow: 0 1px 4px rgba(0,0,0,0.05);
-    }
-
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%);
-        border-radius: 8px;
-        font-weight: 500;
-    }
-
-    .streamlit-expanderHeader:hover {
-        background: linear-gradient(135deg, #e9ecef 0%, #f8f9fa 100%);
-    }
-
-    /* Tabs styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px 8px 0 0;
-        padding: 10px 20px;
-        font-weight: 500;
-    }
-
-    /* Button styling */
-    .stButton > button {
-        border-radius: 10px;
-        font-weight: 500;
-        transition: all 0.2s ease;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }
-
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border: none;
-    }
-
-    .stButton > button[kind="secondary"] {
-        border: 2px solid #667eea;
-        color: #667eea;
-    }
-
-    /* Info/Success/Warning boxes */
-    .stAlert {
-        border-radius: 12px;
-        border: none;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-
-    /* Chat input */
-    .stChatInput > div {
-        border-radius: 24px;
-        border: 2px solid #e0e0e0;
-        transition: border-color 0.2s ease;
-    }
-
-    .stChatInput > div:focus-within {
-        border-color: #667eea;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-    }
-
-    /* Selectbox styling */
-    .stSelectbox > div > div {
-        border-radius: 8px;
-    }
-
-    /* Progress spinner */
-    .stSpinner > div {
-        border-color: #667eea;
-    }
-
-    /* Download button */
-    .stDownloadButton > button {
-        background: #28a745;
-        color: white;
-        border: none;
-        border-radius: 8px;
-    }
-
-    .stDownloadButton > button:hover {
-        background: #218838;
-    }
-
-    /* Code blocks in notes */
-    code {
-        background: #f1f3f4;
-        padding: 2px 6px;
-        border-radius: 4px;
-        font-size: 0.9em;
-    }
-
-    /* Session card in sidebar */
-    .session-item {
-        padding: 0.75rem;
-        margin-bottom: 0.5rem;
-        background: white;
-        border-radius: 10px;
-        border: 1px solid #e0e0e0;
-        cursor: pointer;
-        transition: all 0.2s ease;
-    }
-
-    .session-item:hover {
-        border-color: #667eea;
-        box-shadow: 0 2px 8px rgba(102, 126, 234, 0.2);
-    }
-</style>
-""",
-    unsafe_allow_html=True,
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "app.css")
+
+
+@st.cache_resource(show_spinner=False)
+def _load_css() -> str:
+    """Read the stylesheet once per process and wrap it for injection."""
+    with open(CSS_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+st.markdown(_load_css(), unsafe_allow_html=True)
+
+
+# =============================================================================
+# Chat Options
+# =============================================================================
+
+MODEL_OPTIONS = {
+    "claude-sonnet-4-20250514": "⚡ Sonnet (Fast)",
+    "claude-opus-4-20250514": "🧠 Opus (Best)",
+    "claude-haiku-3-5-20241022": "🚀 Haiku (Quick)",
+}
+MODEL_IDS = tuple(MODEL_OPTIONS)
+MODEL_LABELS = tuple(MODEL_OPTIONS.values())
+LABEL_TO_ID = dict(zip(MODEL_LABELS, MODEL_IDS))
+ID_TO_INDEX = {model_id: i for i, model_id in enumerate(MODEL_IDS)}
+
+
+# Quick research topics as parallel tuples (icon, label, query share an index).
+# Tuples of literals are compile-time constants, so reruns don't rebuild them.
+TOPIC_ICONS = (
+    "🧠",
+    "🧬",
+    "🌍",
+    "🤖",
+    "🧪",
+    "🔋",
+    "🌐",
+    "🧠",
+    "🔬",
+    "🏥",
+    "🚀",
+    "🌱",
+    "🎮",
+    "🔐",
+    "🧬",
+    "🏗️",
+    "🧠",
+    "🌊",
+    "🤖",
+    "💊",
+    "🌿",
+    "🔮",
+    "🧫",
+    "⚡",
+)
+TOPIC_LABELS = (
+    "Transformer Architectures",
+    "CRISPR Gene Editing",
+    "Climate AI",
+    "Large Language Models",
+    "mRNA Vaccines",
+    "Solid-State Batteries",
+    "Web3 & Blockchain",
+    "Neuromorphic Computing",
+    "Quantum Computing",
+    "AI in Drug Discovery",
+    "Space Exploration Tech",
+    "Vertical Farming",
+    "AI in Gaming",
+    "Post-Quantum Cryptography",
+    "Synthetic Biology",
+    "3D Printed Construction",
+    "Brain-Computer Interfaces",
+    "Ocean Energy",
+    "Autonomous Vehicles",
+    "Personalized Medicine",
+    "Carbon Capture",
+    "Augmented Reality",
+    "Lab-Grown Meat",
+    "Nuclear Fusion",
+)
+TOPIC_QUERIES = (
+    "Research transformer architectures in deep learning - key innovations and recent advances",
+    "Research CRISPR gene editing technology - mechanisms, applications, and ethical considerations",
+    "Research how AI and machine learning are being applied to climate change prediction and mitigation",
+    "Research the latest advances in large language models - architectures, training methods, and capabilities",
+    "Research mRNA vaccine technology - how it works, advantages, and future applications beyond COVID-19",
+    "Research solid-state battery technology - current progress, challenges, and potential for electric vehicles",
+    "Research Web3 technologies and blockchain - decentralized systems, smart contracts, and real-world applications",
+    "Research neuromorphic computing - brain-inspired chips, architectures, and applications",
+    "Research quantum computing advances - qubit technologies, algorithms, and near-term applications",
+    "Research AI applications in drug discovery - molecular design, clinical trials, and recent breakthroughs",
+    "Research recent advances in space exploration technology - propulsion, habitation, and Mars missions",
+    "Research vertical farming and controlled environment agriculture - technologies, economics, and sustainability",
+    "Research AI applications in video games - procedural generation, NPCs, and player modeling",
+    "Research post-quantum cryptography - algorithms resistant to quantum attacks and standardization efforts",
+    "Research synthetic biology - engineered organisms, biofuels, and biosensors",
+    "Research 3D printing in construction - materials, techniques, and sustainable building applications",
+    "Research brain-computer interfaces - neural implants, non-invasive methods, and medical applications",
+    "Research ocean energy technologies - wave, tidal, and thermal energy conversion systems",
+    "Research autonomous vehicle technology - sensors, decision-making systems, and regulatory challenges",
+    "Research personalized medicine - genomics, pharmacogenomics, and tailored treatment approaches",
+    "Research carbon capture and storage technologies - direct air capture, geological storage, and utilization",
+    "Research augmented reality technology - displays, tracking, and enterprise applications",
+    "Research cultured meat technology - cell cultivation, scaling challenges, and environmental impact",
+    "Research nuclear fusion energy - tokamaks, stellarators, and recent breakthrough experiments",
 )
 
+# Chat messages rendered on every rerun; older ones are shown on request
+CHAT_HISTORY_WINDOW = 40
+
+WELCOME_HTML = """
+<hr>
+<div class="welcome-card">
+    <h4>👋 Welcome to the Research Agent!</h4>
+    <p>I can help you explore academic topics by searching papers, analyzing PDFs, and generating comprehensive reports.</p>
+</div>
+<div class="welcome-steps">
+    <div><strong>🔍 Step 1: Ask</strong><p>Type your research topic or question in the chat below.</p></div>
+    <div><strong>📚 Step 2: Research</strong><p>I'll search for papers, download PDFs, and analyze the content.</p></div>
+    <div><strong>📄 Step 3: Report</strong><p>Get a comprehensive report with key findings and sources.</p></div>
+</div>
+<hr>
+<div class="welcome-tip">
+    💡 <strong>Tip:</strong> Be specific! Instead of "AI", try "Recent advances in transformer architectures for natural language processing"
+</div>
+"""
+
 
 # =============================================================================
 # Session State Initialization
@@ -265,7 +243,6 @@ if "chat_model" not in st.session_state:
     st.session_state.chat_model = "claude-sonnet-4-20250514"
 
 
-
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -293,29 +270,402 @@ def switch_to_session(session):
     st.session_state.chat_session_path = session["path"]
 
 
+# Finished first-turn runs remembered per browser session
+RESEARCH_CACHE_SIZE = 16
+
+
+def _research_cache() -> OrderedDict:
+    """This browser session's map of prompt key -> finished first-turn research run.
+
+    Kept in session state so a run's session folder is never handed to another user.
+    """
+    return st.session_state.setdefault("research_cache", OrderedDict())
+
+
+@st.cache_resource(show_spinner=False)
+def _email_config() -> EmailConfig:
+    """SMTP settings from the environment, read once per process."""
+    return EmailConfig.from_env()
+
+
+def _prompt_key(prompt: str, model: str) -> str:
+    """Cache key for a research prompt and model, ignoring case and outer whitespace."""
+    key = f"{model}\n{prompt.strip().lower()}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
 # =============================================================================
-# Sidebar
+# Background Event Loop
 # =============================================================================
 
-with st.sidebar:
-    st.markdown("## 🔬 Research Agent")
 
-    # New Chat button
-    if st.button("💬 New Chat", use_container_width=True, type="primary"):
-        # Reset quick topics for fresh experience
-        if "quick_topics" in st.session_state:
-            del st.session_state.quick_topics
-        switch_to_chat()
-        st.rerun()
+@st.cache_resource(show_spinner=False)
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start one long-lived event loop in a daemon thread for agent calls."""
+    loop = asyncio.new_event_loop()
+    # Blocking tool work (PDF parsing, file IO) goes through to_thread; the stock
+    # min(32, cpu_count + 4) workers is low for I/O-bound research
+    loop.set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=int(os.environ.get("RESEARCH_THREAD_POOL_SIZE", "64")),
+            thread_name_prefix="agent-io",
+        )
+    )
+    threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+    return loop
 
-    # Structured Research button
-    if st.button("📋 Structured Research", use_container_width=True):
-        st.session_state.current_view = "structured"
-        st.session_state.selected_session = None
-        st.rerun()
 
-    st.markdown("---")
+_STREAM_END = object()
+
+
+def stream_on_loop(
+    agen,
+    timeout: float | None = None,
+    idle_timeout: float | None = None,
+    maxsize: int = 128,
+):
+    """Drive an async generator on the background loop, yielding its chunks here.
+
+    ``timeout`` bounds the whole stream; ``idle_timeout`` bounds the wait for each
+    chunk, so a long answer that keeps streaming isn't cut off. Chunks pass through
+    a bounded queue, so the agent waits when the UI falls behind.
+    """
+    loop = _get_event_loop()
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def pump():
+        try:
+            async for chunk in agen:
+                await chunks.put(chunk)
+        except Exception as e:
+            await chunks.put(e)  # Hand the error over to be re-raised here
+        else:
+            await chunks.put(_STREAM_END)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if idle_timeout is not None and (remaining is None or idle_timeout < remaining):
+                wait, limit = idle_timeout, idle_timeout
+            else:
+                wait, limit = remaining, timeout
+            get = asyncio.run_coroutine_threadsafe(chunks.get(), loop)
+            try:
+                chunk = get.result(timeout=wait)
+            except TimeoutError:
+                get.cancel()
+                raise TimeoutError(f"No response after {limit:g}s") from None
+            if chunk is _STREAM_END:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        # Don't leave the generator running on the loop after a timeout or error
+        future.cancel()
+
+
+def render_markdown_stream(chunks, placeholder) -> str:
+    """Render streamed markdown into a placeholder and return the full text.
+
+    Finished paragraphs are drawn once into their own element; only the trailing,
+    still-growing block is re-rendered as chunks arrive.
+    """
+    container = placeholder.container()
+    tail = container.empty()
+    text = ""
+    done = 0  # Start of the block that is still growing
+    for chunk in chunks:
+        text += chunk
+        cut = text.rfind("\n\n", done)
+        # Never split inside a fenced code block
+        if cut > done and text.count("```", done, cut) % 2 == 0:
+            tail.markdown(text[done:cut])
+            tail = container.empty()
+            done = cut + 2
+        tail.markdown(text[done:])
+    return text
+
+
+# =============================================================================
+# Cached Filesystem Helpers
+# =============================================================================
+# Streamlit reruns this whole script on every interaction, so anything that
+# walks the session folders is cached and keyed by directory mtime: the cache
+# invalidates itself as soon as a PDF or note is added.
+
+
+def _mtime(path: str) -> float:
+    """Modification time of a path, or 0 if it does not exist."""
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return 0
+
+
+@st.cache_resource(show_spinner=False)
+def _io_executor() -> ThreadPoolExecutor:
+    """Thread pool for session folder deletes, created once per process."""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="session-io")
+
+
+# Model family -> (icon, display name)
+MODEL_FAMILIES = {"opus": ("🧠", "Opus"), "sonnet": ("⚡", "Sonnet"), "haiku": ("🚀", "Haiku")}
+MODEL_ICON = {family: icon for family, (icon, _) in MODEL_FAMILIES.items()}
+
+
+def _session_label(session: dict) -> str:
+    """Build the sidebar button label for a session."""
+    # Parse info
+    try:
+        date_str = session["folder"][:15]
+        date = datetime.strptime(date_str, "%Y%m%d_%H%M%S")
+        date_display = date.strftime("%b %d, %H:%M")
+    except (ValueError, KeyError):
+        date_display = ""
 
+    topic = session.get("metadata", {}).get("topic", session["topic"])
+    # Clean up topic display
+    topic = topic.replace("_", " ").replace("chat research", "").strip()
+    if not topic or topic.lower() in ["chat", "research"]:
+        topic = "Research Session"
+    if len(topic) > 28:
+        topic = topic[:25] + "..."
+
+    # Status - check for completion AND report
+    has_completion = session.get("completion") is not None
+    has_report = session.get("has_report", False)
+    pdf_count = len(session.get("pdfs", []))
+
+    # Determine status icon
+    if has_completion and has_report:
+        status = "✅"  # Fully complete with report
+    elif has_completion and pdf_count > 0:
+        status = "📄"  # Complete with PDFs but no report
+    elif has_completion:
+        status = "📝"  # Complete but minimal data
+    else:
+        status = "⏳"  # In progress
+
+    # Model info
+    model = session.get("metadata", {}).get("model", "") or session.get(
+        "completion", {}
+    ).get("model", "")
+    model_short = next((MODEL_ICON[p] for p in model.lower().split("-") if p in MODEL_ICON), "")
+
+    # Duration info
+    duration = session.get("completion", {}).get("duration_seconds", 0)
+    if duration >= 60:
+        duration_str = f"{int(duration//60)}m"
+    elif duration > 0:
+        duration_str = f"{int(duration)}s"
+    else:
+        duration_str = ""
+
+    # Build label
+    btn_label = f"{status} **{topic}**"
+    meta_parts = []
+    if date_display:
+        meta_parts.append(date_display)
+    if model_short:
+        meta_parts.append(model_short)
+    if duration_str:
+        meta_parts.append(duration_str)
+    if pdf_count:
+        meta_parts.append(f"📚{pdf_count}")
+
+    if meta_parts:
+        btn_label += f"\n\n{' • '.join(meta_parts)}"
+
+    return btn_label
+
+
+@st.cache_data(show_spinner=False, ttl=30)
+def _cached_sessions(root_mtime: float) -> list[dict]:
+    """List sessions worth showing in the sidebar, with their button labels prebuilt.
+
+    The root mtime only changes when a session folder is added or removed; the
+    short TTL picks up sessions that finish (completion/report) in place.
+    """
+    return [
+        {"label": _session_label(s), "key": f"sess_{s['folder']}", "session": s}
+        for s in list_research_sessions(SESSIONS_DIR)
+        if s.get("metadata")
+        or s.get("completion")
+        or s.get("has_report")
+        or len(s.get("pdfs", [])) > 0
+    ]
+
+
+def _session_fingerprint(path: str) -> tuple[int, ...]:
+    """mtime_ns of a session folder, its pdfs/ and notes/ folders, the notes file and
+    report.md (0 if missing).
+
+    Adding a PDF or legacy note touches its folder, while appending a note or
+    rewriting the report touches the file, so any change the session view shows
+    yields a new fingerprint.
+    """
+    stamps = []
+    for name in ("", "pdfs", "notes", os.path.join("notes", NOTES_FILENAME), "report.md"):
+        try:
+            stamps.append(os.stat(os.path.join(path, name)).st_mtime_ns)
+        except FileNotFoundError:
+            stamps.append(0)
+    return tuple(stamps)
+
+
+def _error_note(label: str, error: Exception) -> dict:
+    """Stand-in for a note that could not be parsed, labelled with where it came from."""
+    return {"title": label, "content": f"Error reading note: {error}"}
+
+
+# Note fields the session view renders; st.cache_data pickles its result on every
+# hit, so notes are trimmed to these before caching
+NOTE_FIELDS = ("title", "content", "source", "tags")
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_session_view(path: str, fingerprint: tuple) -> dict:
+    """Read what the session view shows from disk, once per fingerprint.
+
+    Notes are only parsed (and grouped by type) when there is no report to show.
+    """
+    pdfs = get_session_pdfs(path)
+    notes_dir = os.path.join(path, "notes")
+    report = get_session_report(path)
+
+    groups = None
+    if report:
+        notes_count = count_notes(notes_dir)
+    else:
+        try:
+            notes = load_notes(notes_dir, on_error=_error_note)
+        except FileNotFoundError:
+            notes = []
+        notes_count = len(notes)
+        groups = {"summaries": [], "findings": [], "other": []}
+        for note_data in notes:
+            note_type = note_data.get("type", note_data.get("note_type", "other"))
+            note = {k: note_data[k] for k in NOTE_FIELDS if k in note_data}
+            if note_type == "finding":
+                groups["findings"].append(note)
+            elif note_type == "paper_summary":
+                groups["summaries"].append(note)
+            else:
+                groups["other"].append(note)
+
+    return {"report": report, "pdfs": pdfs, "notes_count": notes_count, "notes": groups}
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_followup_options(path: str, model: str | None, fingerprint: tuple):
+    """Agent options for a session's follow-up chat, rebuilt when the session changes."""
+    return build_followup_options(path, model)
+
+
+def _followup_options(path: str, model: str | None, fingerprint: tuple):
+    """A private copy of the cached follow-up options, so no two chats share one object."""
+    return copy.copy(_cached_followup_options(path, model, fingerprint))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _pdf_data_uri(path: str, size: int, mtime_ns: int) -> str:
+    """Base64-encode a PDF for embedding in the viewer iframe.
+
+    Keyed by size and mtime_ns as well, so a re-downloaded file is re-encoded even
+    when it lands within the same coarse mtime tick.
+    """
+    if not size:
+        return ""  # mmap refuses empty files
+    # Encode straight from the page cache rather than a read() copy of the file
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return base64.b64encode(mm).decode("ascii")
+
+
+def _static_pdf_url(session_folder: str, pdf_path: str) -> str | None:
+    """Expose a session PDF under ./static and return its URL, or None if unavailable.
+
+    The browser then fetches (and caches) the file directly instead of receiving
+    it base64-encoded in the page.
+    """
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    name = os.path.basename(pdf_path)
+    target = os.path.join(STATIC_DIR, "sessions", session_folder, name)
+    try:
+        src_mtime = os.stat(pdf_path).st_mtime
+        try:
+            current = os.stat(target).st_mtime == src_mtime
+        except FileNotFoundError:
+            current = None
+        if current is False:
+            os.remove(target)  # Source was re-downloaded
+        if not current:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                # Symlinks resolve outside ./static and are refused, so hard-link
+                os.link(pdf_path, target)
+            except OSError:
+                shutil.copy2(pdf_path, target)
+    except OSError:
+        return None
+    return f"app/static/sessions/{quote(session_folder)}/{quote(name)}"
+
+
+@functools.lru_cache(maxsize=2048)
+def _pdf_display_name(pdf: str) -> str:
+    """Clean up a PDF filename for display."""
+    display_name = pdf.replace("_", " ").replace(".pdf", "")
+    if len(display_name) > 60:
+        display_name = display_name[:57] + "..."
+    return display_name
+
+
+@st.cache_data(show_spinner=False)
+def _pdf_table_markdown(links: tuple) -> str:
+    """Build the markdown table for (filename, static URL) pairs."""
+    rows = ["| # | Paper | |", "|---:|---|:---:|"]
+    for i, (pdf, url) in enumerate(links, 1):
+        link = f'<a href="{url}" download="{pdf}">⬇️ Download</a>'
+        rows.append(f"| **{i}.** | 📄 {_pdf_display_name(pdf)} | {link} |")
+    return "\n".join(rows)
+
+
+def _pdf_table(session_folder: str, pdfs_dir: str, pdfs: list[str]) -> str | None:
+    """Render a session's PDF list as a single markdown table of static download links.
+
+    The static links are (re)created on every call, outside the cache, so a cleaned
+    ./static never leaves the table pointing at missing files. Returns None when the
+    PDFs can't be served statically, so the caller falls back to one download button
+    per PDF.
+    """
+    links = []
+    for pdf in pdfs:
+        url = _static_pdf_url(session_folder, os.path.join(pdfs_dir, pdf))
+        if url is None:
+            return None
+        links.append((pdf, url))
+    return _pdf_table_markdown(tuple(links))
+
+
+def _read_file_bytes(path: str) -> bytes:
+    """Read a file's raw bytes (used for deferred downloads)."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# =============================================================================
+# Fragments
+# =============================================================================
+# Fragments rerun on their own when their widgets change, so typing into the
+# follow-up chat doesn't redraw the sidebar, header and session tabs.
+
+
+@st.fragment
+def _session_history():
+    """Sidebar list of past sessions with the clear-all control."""
     # Research History section with management
     history_col1, history_col2 = st.columns([3, 1])
     with history_col1:
@@ -325,18 +675,8 @@ with st.sidebar:
         if "confirm_clear" not in st.session_state:
             st.session_state.confirm_clear = False
 
-    # List sessions
-    sessions = list_research_sessions()
-
-    # Filter to show only meaningful sessions (with metadata or completion)
-    valid_sessions = [
-        s
-        for s in sessions
-        if s.get("metadata")
-        or s.get("completion")
-        or s.get("has_report")
-        or len(s.get("pdfs", [])) > 0
-    ]
+    # List sessions with metadata or results (cached until a folder is added/removed)
+    valid_sessions = _cached_sessions(_mtime(SESSIONS_DIR))
 
     if not valid_sessions:
         st.caption("✨ No research sessions yet")
@@ -351,12 +691,12 @@ with st.sidebar:
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("✓ Yes", use_container_width=True, type="primary"):
-                    # Delete all sessions
-                    for session in valid_sessions:
-                        try:
-                            shutil.rmtree(session["path"])
-                        except Exception:
-                            pass
+                    # Delete all sessions (I/O-bound, so in parallel)
+                    paths = [item["session"]["path"] for item in valid_sessions]
+                    paths.append(os.path.join(STATIC_DIR, "sessions"))
+                    rmtree = functools.partial(shutil.rmtree, ignore_errors=True)
+                    list(_io_executor().map(rmtree, paths))
+                    _cached_sessions.clear()
                     st.session_state.confirm_clear = False
                     st.session_state.selected_session = None
                     st.session_state.current_view = "chat"
@@ -372,80 +712,116 @@ with st.sidebar:
 
         st.markdown("---")
 
-        for session in valid_sessions:
-            # Parse info
-            try:
-                date_str = session["folder"][:15]
-                date = datetime.strptime(date_str, "%Y%m%d_%H%M%S")
-                date_display = date.strftime("%b %d, %H:%M")
-            except (ValueError, KeyError):
-                date_display = ""
-
-            topic = session.get("metadata", {}).get("topic", session["topic"])
-            # Clean up topic display
-            topic = topic.replace("_", " ").replace("chat research", "").strip()
-            if not topic or topic.lower() in ["chat", "research"]:
-                topic = "Research Session"
-            if len(topic) > 28:
-                topic = topic[:25] + "..."
-
-            # Status - check for completion AND report
-            has_completion = session.get("completion") is not None
-            has_report = session.get("has_report", False)
-            pdf_count = len(session.get("pdfs", []))
-
-            # Determine status icon
-            if has_completion and has_report:
-                status = "✅"  # Fully complete with report
-            elif has_completion and pdf_count > 0:
-                status = "📄"  # Complete with PDFs but no report
-            elif has_completion:
-                status = "📝"  # Complete but minimal data
-            else:
-                status = "⏳"  # In progress
-
-            # Model info
-            model = session.get("metadata", {}).get("model", "") or session.get(
-                "completion", {}
-            ).get("model", "")
-            model_short = ""
-            if model:
-                if "opus" in model.lower():
-                    model_short = "🧠"
-                elif "sonnet" in model.lower():
-                    model_short = "⚡"
-                elif "haiku" in model.lower():
-                    model_short = "🚀"
-
-            # Duration info
-            duration = session.get("completion", {}).get("duration_seconds", 0)
-            if duration >= 60:
-                duration_str = f"{int(duration//60)}m"
-            elif duration > 0:
-                duration_str = f"{int(duration)}s"
-            else:
-                duration_str = ""
-
-            # Build label
-            btn_label = f"{status} **{topic}**"
-            meta_parts = []
-            if date_display:
-                meta_parts.append(date_display)
-            if model_short:
-                meta_parts.append(model_short)
-            if duration_str:
-                meta_parts.append(duration_str)
-            if pdf_count:
-                meta_parts.append(f"📚{pdf_count}")
-
-            if meta_parts:
-                btn_label += f"\n\n{' • '.join(meta_parts)}"
-
-            if st.button(btn_label, key=f"sess_{session['folder']}", use_container_width=True):
-                switch_to_session(session)
+        for item in valid_sessions:
+            if st.button(item["label"], key=item["key"], use_container_width=True):
+                switch_to_session(item["session"])
                 st.rerun()
 
 
+@st.fragment
+def _followup_chat(session: dict):
+    """Follow-up Q&A for a session; chat input reruns only this fragment."""
+    # Session-specific chat
+    chat_key = f"chat_{session['folder']}"
+    if chat_key not in st.session_state:
+        st.session_state[chat_key] = []
+
+    # Display messages
+    for msg in st.session_state[chat_key]:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+    # Chat input
+    if followup := st.chat_input("Ask about the research...", key=f"input_{session['folder']}"):
+        st.session_state[chat_key].append({"role": "user", "content": followup})
+
+        with st.chat_message("user"):
+            st.markdown(followup)
+
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
+            response_container = [""]  # Use mutable container for async access
+
+            # Show spinner while processing
+            with st.spinner("💭 Thinking..."):
+                try:
+                    followup_history = list(st.session_state[chat_key][:-1])
+                    sess_model = session.get("metadata", {}).get("model")
+
+                    sess_path = session["path"]
+                    fingerprint = _session_fingerprint(sess_path)
+                    response_stream = chat_with_agent(
+                        followup,
+                        followup_history,
+                        mode="followup",
+                        research_session_path=sess_path,
+                        model=sess_model,
+                        options=_followup_options(sess_path, sess_model, fingerprint),
+                    )
+                    response_container[0] = render_markdown_stream(
+                        stream_on_loop(response_stream, idle_timeout=300), placeholder
+                    )
+
+                except Exception as e:
+                    import traceback
+
+                    error_details = traceback.format_exc()
+                    response_container[0] = f"Error: {str(e)}\n\n```\n{error_details}\n```"
+                    placeholder.markdown(response_container[0])
+
+            st.session_state[chat_key].append(
+                {"role": "assistant", "content": response_container[0]}
+            )
+
+
+@st.fragment
+def _quick_topics():
+    """Three sampled research topics with a control to draw different ones."""
+    ss = st.session_state
+
+    def draw_topics():
+        ss.quick_topics = random.sample(range(len(TOPIC_LABELS)), 3)
+
+    # Initialize or get random topics for this session (indices into the pool)
+    if "quick_topics" not in ss:
+        draw_topics()
+
+    for col, i in zip(st.columns(3), ss.quick_topics):
+        with col:
+            if st.button(f"{TOPIC_ICONS[i]} {TOPIC_LABELS[i]}", use_container_width=True):
+                ss.pending_query = TOPIC_QUERIES[i]
+                st.rerun()  # The chat handler lives outside this fragment
+
+    # Refresh topics button; the callback runs before the fragment redraws
+    st.button("🔄 Show different topics", type="secondary", on_click=draw_topics)
+
+
+# =============================================================================
+# Sidebar
+# =============================================================================
+
+with st.sidebar:
+    st.markdown("## 🔬 Research Agent")
+
+    # New Chat button
+    if st.button("💬 New Chat", use_container_width=True, type="primary"):
+        # Reset quick topics for fresh experience
+        if "quick_topics" in st.session_state:
+            del st.session_state.quick_topics
+        switch_to_chat()
+        st.rerun()
+
+    # Structured Research button
+    if st.button("📋 Structured Research", use_container_width=True):
+        st.session_state.current_view = "structured"
+        st.session_state.selected_session = None
+        st.rerun()
+
+    st.markdown("---")
+
+    _session_history()
+
+
 # =============================================================================
 # Main Content Area
 # =============================================================================
@@ -467,6 +843,11 @@ st.markdown(
 # =============================================================================
 
 if st.session_state.current_view == "chat":
+    # Bind session state once; each attribute access goes through the proxy
+    ss = st.session_state
+    messages = ss.chat_messages
+    session_path = ss.chat_session_path
+
     st.markdown("### 💬 Chat with Research Agent")
 
     # Model selector row with descriptions
@@ -476,89 +857,47 @@ if st.session_state.current_view == "chat":
             "Ask me to research any topic. I'll search for papers, analyze them, and share my findings."
         )
     with col2:
-        model_options = {
-            "claude-sonnet-4-20250514": "⚡ Sonnet (Fast)",
-            "claude-opus-4-20250514": "🧠 Opus (Best)",
-            "claude-haiku-3-5-20241022": "🚀 Haiku (Quick)",
-        }
         selected_display = st.selectbox(
             "Model",
-            list(model_options.values()),
-            index=list(model_options.keys()).index(st.session_state.chat_model),
+            MODEL_LABELS,
+            index=ID_TO_INDEX[ss.chat_model],
             key="chat_model_selector",
             label_visibility="collapsed",
         )
         # Map back to model ID
-        st.session_state.chat_model = list(model_options.keys())[
-            list(model_options.values()).index(selected_display)
-        ]
+        model = ss.chat_model = LABEL_TO_ID[selected_display]
 
     # Welcome section for new users (show when no messages)
-    if not st.session_state.chat_messages:
-        st.markdown("---")
-
-        # Welcome card
-        st.markdown(
-            """
-        <div style="background: linear-gradient(135deg, #f5f7fa 0%, #e4e8ec 100%); padding: 1.5rem; border-radius: 12px; margin-bottom: 1rem;">
-            <h4 style="margin: 0 0 0.5rem 0;">👋 Welcome to the Research Agent!</h4>
-            <p style="margin: 0; color: #555;">I can help you explore academic topics by searching papers, analyzing PDFs, and generating comprehensive reports.</p>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
-
-        # How it works
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(
-                """
-            **🔍 Step 1: Ask**
-
-            Type your research topic or question in the chat below.
-            """
-            )
-        with col2:
-            st.markdown(
-                """
-            **📚 Step 2: Research**
-
-            I'll search for papers, download PDFs, and analyze the content.
-            """
-            )
-        with col3:
-            st.markdown(
-                """
-            **📄 Step 3: Report**
-
-            Get a comprehensive report with key findings and sources.
-            """
-            )
-
-        st.markdown("---")
-        st.info(
-            '💡 **Tip:** Be specific! Instead of "AI", try "Recent advances in transformer architectures for natural language processing"'
-        )
-
-    # Display chat messages
-    for msg in st.session_state.chat_messages:
+    if not messages:
+        # Welcome card, how-it-works steps and tip in one static block
+        st.markdown(WELCOME_HTML, unsafe_allow_html=True)
+
+    # Display chat messages: only the most recent window unless asked for more
+    earlier_count = len(messages) - CHAT_HISTORY_WINDOW
+    if earlier_count > 0:
+        # A toggle rather than an expander: collapsed expanders still render their contents
+        if st.toggle(f"Show {earlier_count} earlier messages", key="show_earlier_messages"):
+            for msg in messages[:earlier_count]:
+                with st.chat_message(msg["role"]):
+                    st.markdown(msg["content"])
+    for msg in messages[-CHAT_HISTORY_WINDOW:]:
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
 
     # Control buttons (show after messages exist)
-    if st.session_state.chat_messages:
+    if messages:
         st.markdown("---")
         col1, col2, col3 = st.columns([1, 1, 2])
         with col1:
             if st.button("🔄 New Research", use_container_width=True, type="primary"):
                 # Reset quick topics for fresh experience
-                if "quick_topics" in st.session_state:
-                    del st.session_state.quick_topics
+                if "quick_topics" in ss:
+                    del ss.quick_topics
                 clear_chat()
                 st.rerun()
         with col2:
             if st.button("🛑 End Session", use_container_width=True, type="secondary"):
-                st.session_state.stop_requested = True
+                ss.stop_requested = True
                 st.success("Session ended. Start a new research or ask follow-up questions!")
         st.markdown("---")
 
@@ -566,12 +905,13 @@ if st.session_state.current_view == "chat":
     chat_prompt = st.chat_input("Ask me to research something...", key="chat_input")
 
     # Check for pending query from quick topic buttons
-    pending_query = st.session_state.pop("pending_query", None)
-    prompt = chat_prompt or pending_query
+    pending_query = ss.pop("pending_query", None)
+    # Whitespace-only submissions would otherwise start a full agent run
+    prompt = (chat_prompt or pending_query or "").strip()
 
     if prompt:
         # Add user message
-        st.session_state.chat_messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "user", "content": prompt})
 
         with st.chat_message("user"):
             st.markdown(prompt)
@@ -581,286 +921,140 @@ if st.session_state.current_view == "chat":
             response_placeholder = st.empty()
             response_container = [""]
 
-            # Show spinner while processing
-            with st.spinner("🔬 Researching... This may take a few minutes..."):
-                # Track start time for duration
-                start_time = datetime.now()
-
-                try:
-                    # Always create session folder if one doesn't exist
-                    if not st.session_state.chat_session_path:
-                        from web_research_tools import ResearchConfig
-
-                        topic_words = prompt.split()[:5]
-                        topic_slug = "_".join(topic_words)[:30]
-                        st.session_state.chat_session_path = ResearchConfig.create_session_folder(
-                            topic_slug, "research_sessions"
-                        )
-                        # Save metadata for chat session
-                        chat_metadata = {
-                            "topic": " ".join(topic_words),
-                            "mode": "chat",
-                            "model": st.session_state.chat_model,
-                            "created_at": datetime.now().isoformat(),
-                        }
-                        with open(
-                            os.path.join(st.session_state.chat_session_path, "metadata.json"), "w"
-                        ) as f:
-                            json.dump(chat_metadata, f, indent=2)
-
-                    import concurrent.futures
-
-                    # Capture values before entering thread
-                    chat_history = list(st.session_state.chat_messages[:-1])
-                    session_path = st.session_state.chat_session_path
-
-                    # Store cost info from callback
-                    cost_info = {"duration_ms": 0, "cost_usd": 0}
-
-                    def on_complete(duration_ms, cost_usd):
-                        cost_info["duration_ms"] = duration_ms
-                        cost_info["cost_usd"] = cost_usd
-
-                    def run_async_chat(user_prompt, history, sess_path, chat_model):
-                        """Run the async chat using anyio for proper task context."""
-                        import anyio
-
-                        if sys.platform == "win32":
-                            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-
-                        async def collect_response():
-                            result = ""
-                            async for chunk in chat_with_agent(
-                                user_prompt,
-                                history,
-                                mode="research",
-                                research_session_path=sess_path,
-                                model=chat_model,
-                                on_complete=on_complete,
-                            ):
-                                result += chunk
-                            return result
-
-                        return anyio.run(
-                            collect_response,
-                            backend="asyncio",
-                            backend_options={"use_uvloop": False},
-                        )
-
-                    selected_model = st.session_state.chat_model
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(
-                            run_async_chat, prompt, chat_history, session_path, selected_model
-                        )
-                        response_container[0] = future.result(timeout=300)
-
-                    response_placeholder.markdown(response_container[0])
+            # Repeating an earlier opening prompt (e.g. a quick topic) reuses that run
+            first_turn = not session_path
+            cache_key = _prompt_key(prompt, model) if first_turn else None
+            research_cache = _research_cache()
+            cached = research_cache.get(cache_key)
+            if cached and os.path.isdir(cached["session_path"]):
+                research_cache.move_to_end(cache_key)
+                session_path = ss.chat_session_path = cached["session_path"]
+                response_container[0] = cached["response"]
+                response_placeholder.markdown(response_container[0])
+                st.caption("♻️ Showing results from an earlier run of this research.")
+            else:
+                # Show spinner while processing
+                with st.spinner("🔬 Researching... This may take a few minutes..."):
+                    # Track start time for duration
+                    start_perf = time.perf_counter()
 
-                    # Save/update completion.json with duration and cost
-                    if st.session_state.chat_session_path:
-                        completion_path = os.path.join(
-                            st.session_state.chat_session_path, "completion.json"
-                        )
-                        end_time = datetime.now()
-                        duration_seconds = (end_time - start_time).total_seconds()
-
-                        # Load existing completion data or create new
-                        if os.path.exists(completion_path):
-                            with open(completion_path, "r") as f:
-                                completion_data = json.load(f)
-                            # Add to existing duration and cost
-                            completion_data["duration_seconds"] = (
-                                completion_data.get("duration_seconds", 0) + duration_seconds
+                    try:
+                        # Always create session folder if one doesn't exist
+                        if not session_path:
+                            # maxsplit stops scanning once the first five words are found
+                            topic_words = prompt.split(maxsplit=5)[:5]
+                            topic_slug = "_".join(topic_words)[:30]
+                            session_path = ss.chat_session_path = (
+                                ResearchConfig.create_session_folder(topic_slug, SESSIONS_DIR)
                             )
-                            completion_data["cost_usd"] = completion_data.get(
-                                "cost_usd", 0
-                            ) + cost_info.get("cost_usd", 0)
-                        else:
-                            completion_data = {
-                                "completed_at": end_time.isoformat(),
+                            # Save metadata for chat session
+                            chat_metadata = {
+                                "topic": " ".join(topic_words),
                                 "mode": "chat",
-                                "model": st.session_state.chat_model,
-                                "duration_seconds": duration_seconds,
-                                "cost_usd": cost_info.get("cost_usd", 0),
-                                "stats": {},
+                                "model": model,
+                                "created_at": datetime.now().isoformat(),
                             }
+                            write_session_json(
+                                os.path.join(session_path, "metadata.json"), chat_metadata
+                            )
 
-                        completion_data["last_updated"] = end_time.isoformat()
-                        with open(completion_path, "w") as f:
-                            json.dump(completion_data, f, indent=2)
-
-                        # Show completion summary
-                        st.success(
-                            f"✅ Research complete! Duration: {duration_seconds:.0f}s | Cost: ${cost_info.get('cost_usd', 0):.4f}"
+                        chat_history = messages[:-1]
+
+                        # Store cost info from callback
+                        cost_info = {"duration_ms": 0, "cost_usd": 0, "completed": False}
+
+                        def on_complete(duration_ms, cost_usd, is_error):
+                            cost_info["duration_ms"] = duration_ms
+                            cost_info["cost_usd"] = cost_usd
+                            # Called for every finished run, including ones that hit the
+                            # turn or budget limit; only clean runs are worth replaying
+                            cost_info["completed"] = not is_error
+
+                        response_stream = chat_with_agent(
+                            prompt,
+                            chat_history,
+                            mode="research",
+                            research_session_path=session_path,
+                            model=model,
+                            on_complete=on_complete,
+                        )
+                        response_container[0] = render_markdown_stream(
+                            stream_on_loop(response_stream, timeout=300), response_placeholder
                         )
 
-                except Exception as e:
-                    error_details = traceback.format_exc()
-                    response_container[0] = f"Error: {str(e)}\n\n```\n{error_details}\n```"
-                    response_placeholder.markdown(response_container[0])
+                        # Save/update completion.json with duration and cost
+                        if session_path:
+                            completion_path = os.path.join(session_path, "completion.json")
+                            duration_seconds = time.perf_counter() - start_perf
+                            end_time = datetime.now()  # Wall-clock stamp for the record
+
+                            # Reuse this session's completion data from earlier turns;
+                            # only read the file when (re)attaching to a session
+                            completion_data = None
+                            cached_completion = ss.get("chat_completion")
+                            if cached_completion and cached_completion[0] == completion_path:
+                                completion_data = cached_completion[1]
+                            elif os.path.exists(completion_path):
+                                with open(completion_path, "rb") as f:
+                                    completion_data = (orjson or json).loads(f.read())
+
+                            if completion_data is not None:
+                                # Add to existing duration and cost
+                                completion_data["duration_seconds"] = (
+                                    completion_data.get("duration_seconds", 0) + duration_seconds
+                                )
+                                completion_data["cost_usd"] = completion_data.get(
+                                    "cost_usd", 0
+                                ) + cost_info.get("cost_usd", 0)
+                            else:
+                                completion_data = {
+                                    "completed_at": end_time.isoformat(),
+                                    "mode": "chat",
+                                    "model": model,
+                                    "duration_seconds": duration_seconds,
+                                    "cost_usd": cost_info.get("cost_usd", 0),
+                                    "stats": {},
+                                }
+
+                            completion_data["last_updated"] = end_time.isoformat()
+                            write_session_json(completion_path, completion_data)
+                            ss.chat_completion = (completion_path, completion_data)
+
+                            # Remember first-turn runs so repeating the prompt reuses them
+                            if cache_key and cost_info["completed"]:
+                                research_cache[cache_key] = {
+                                    "response": response_container[0],
+                                    "session_path": session_path,
+                                    "cost_usd": cost_info.get("cost_usd", 0),
+                                }
+                                while len(research_cache) > RESEARCH_CACHE_SIZE:
+                                    research_cache.popitem(last=False)
+
+                            # Show completion summary
+                            st.success(
+                                f"✅ Research complete! Duration: {duration_seconds:.0f}s | Cost: ${cost_info.get('cost_usd', 0):.4f}"
+                            )
+
+                    except Exception as e:
+                        import traceback
+
+                        error_details = traceback.format_exc()
+                        response_container[0] = f"Error: {str(e)}\n\n```\n{error_details}\n```"
+                        response_placeholder.markdown(response_container[0])
 
             # Save assistant response
-            st.session_state.chat_messages.append(
-                {"role": "assistant", "content": response_container[0]}
-            )
+            messages.append({"role": "assistant", "content": response_container[0]})
 
-            # Rerun to refresh sidebar with new session
-            st.rerun()
+            # Later turns are already drawn in place; only a new session needs the
+            # sidebar and control buttons redrawn
+            if first_turn:
+                st.rerun()
 
     # Quick action buttons with rotating topics
     st.markdown("---")
     st.markdown("**💡 Quick Research Topics:**")
 
-    # Pool of diverse research topics
-    ALL_RESEARCH_TOPICS = [
-        {
-            "icon": "🧠",
-            "label": "Transformer Architectures",
-            "query": "Research transformer architectures in deep learning - key innovations and recent advances",
-        },
-        {
-            "icon": "🧬",
-            "label": "CRISPR Gene Editing",
-            "query": "Research CRISPR gene editing technology - mechanisms, applications, and ethical considerations",
-        },
-        {
-            "icon": "🌍",
-            "label": "Climate AI",
-            "query": "Research how AI and machine learning are being applied to climate change prediction and mitigation",
-        },
-        {
-            "icon": "🤖",
-            "label": "Large Language Models",
-            "query": "Research the latest advances in large language models - architectures, training methods, and capabilities",
-        },
-        {
-            "icon": "🧪",
-            "label": "mRNA Vaccines",
-            "query": "Research mRNA vaccine technology - how it works, advantages, and future applications beyond COVID-19",
-        },
-        {
-            "icon": "🔋",
-            "label": "Solid-State Batteries",
-            "query": "Research solid-state battery technology - current progress, challenges, and potential for electric vehicles",
-        },
-        {
-            "icon": "🌐",
-            "label": "Web3 & Blockchain",
-            "query": "Research Web3 technologies and blockchain - decentralized systems, smart contracts, and real-world applications",
-        },
-        {
-            "icon": "🧠",
-            "label": "Neuromorphic Computing",
-            "query": "Research neuromorphic computing - brain-inspired chips, architectures, and applications",
-        },
-        {
-            "icon": "🔬",
-            "label": "Quantum Computing",
-            "query": "Research quantum computing advances - qubit technologies, algorithms, and near-term applications",
-        },
-        {
-            "icon": "🏥",
-            "label": "AI in Drug Discovery",
-            "query": "Research AI applications in drug discovery - molecular design, clinical trials, and recent breakthroughs",
-        },
-        {
-            "icon": "🚀",
-            "label": "Space Exploration Tech",
-            "query": "Research recent advances in space exploration technology - propulsion, habitation, and Mars missions",
-        },
-        {
-            "icon": "🌱",
-            "label": "Vertical Farming",
-            "query": "Research vertical farming and controlled environment agriculture - technologies, economics, and sustainability",
-        },
-        {
-            "icon": "🎮",
-            "label": "AI in Gaming",
-            "query": "Research AI applications in video games - procedural generation, NPCs, and player modeling",
-        },
-        {
-            "icon": "🔐",
-            "label": "Post-Quantum Cryptography",
-            "query": "Research post-quantum cryptography - algorithms resistant to quantum attacks and standardization efforts",
-        },
-        {
-            "icon": "🧬",
-            "label": "Synthetic Biology",
-            "query": "Research synthetic biology - engineered organisms, biofuels, and biosensors",
-        },
-        {
-            "icon": "🏗️",
-            "label": "3D Printed Construction",
-            "query": "Research 3D printing in construction - materials, techniques, and sustainable building applications",
-        },
-        {
-            "icon": "🧠",
-            "label": "Brain-Computer Interfaces",
-            "query": "Research brain-computer interfaces - neural implants, non-invasive methods, and medical applications",
-        },
-        {
-            "icon": "🌊",
-            "label": "Ocean Energy",
-            "query": "Research ocean energy technologies - wave, tidal, and thermal energy conversion systems",
-        },
-        {
-            "icon": "🤖",
-            "label": "Autonomous Vehicles",
-            "query": "Research autonomous vehicle technology - sensors, decision-making systems, and regulatory challenges",
-        },
-        {
-            "icon": "💊",
-            "label": "Personalized Medicine",
-            "query": "Research personalized medicine - genomics, pharmacogenomics, and tailored treatment approaches",
-        },
-        {
-            "icon": "🌿",
-            "label": "Carbon Capture",
-            "query": "Research carbon capture and storage technologies - direct air capture, geological storage, and utilization",
-        },
-        {
-            "icon": "🔮",
-            "label": "Augmented Reality",
-            "query": "Research augmented reality technology - displays, tracking, and enterprise applications",
-        },
-        {
-            "icon": "🧫",
-            "label": "Lab-Grown Meat",
-            "query": "Research cultured meat technology - cell cultivation, scaling challenges, and environmental impact",
-        },
-        {
-            "icon": "⚡",
-            "label": "Nuclear Fusion",
-            "query": "Research nuclear fusion energy - tokamaks, stellarators, and recent breakthrough experiments",
-        },
-    ]
-
-    # Initialize or get random topics for this session
-    if "quick_topics" not in st.session_state:
-        st.session_state.quick_topics = random.sample(ALL_RESEARCH_TOPICS, 3)
-
-    col1, col2, col3 = st.columns(3)
-    topics = st.session_state.quick_topics
-
-    with col1:
-        if st.button(f"{topics[0]['icon']} {topics[0]['label']}", use_container_width=True):
-            st.session_state.pending_query = topics[0]["query"]
-            st.rerun()
-
-    with col2:
-        if st.button(f"{topics[1]['icon']} {topics[1]['label']}", use_container_width=True):
-            st.session_state.pending_query = topics[1]["query"]
-            st.rerun()
-
-    with col3:
-        if st.button(f"{topics[2]['icon']} {topics[2]['label']}", use_container_width=True):
-            st.session_state.pending_query = topics[2]["query"]
-            st.rerun()
-
-    # Refresh topics button
-    if st.button("🔄 Show different topics", type="secondary"):
-        st.session_state.quick_topics = random.sample(ALL_RESEARCH_TOPICS, 3)
-        st.rerun()
+    _quick_topics()
 
 
 # =============================================================================
@@ -966,47 +1160,40 @@ elif st.session_state.current_view == "structured":
 
 elif st.session_state.current_view == "view_session" and st.session_state.selected_session:
     session = st.session_state.selected_session
-    topic = session.get("metadata", {}).get("topic", session["topic"])
+    session_path = session["path"]
+    folder = session["folder"]
+    meta = session.get("metadata", {})
+    comp = session.get("completion", {})
+    pdfs_dir = os.path.join(session_path, "pdfs")
+    fingerprint = _session_fingerprint(session_path)
+    if not fingerprint[0]:
+        st.error("📭 This session's folder no longer exists.")
+        st.stop()
+    view = _load_session_view(session_path, fingerprint)
+    topic = meta.get("topic", session["topic"])
 
     st.markdown(f"### 📋 {topic}")
 
     # Stats row
-    comp = session.get("completion", {})
     stats = comp.get("stats", {})
 
     # Get model info (try metadata first, fall back to completion)
-    model_full = session.get("metadata", {}).get("model") or comp.get("model", "Unknown")
-    if "opus" in model_full.lower():
-        model_display = "Opus"
-    elif "sonnet" in model_full.lower():
-        model_display = "Sonnet"
-    elif "haiku" in model_full.lower():
-        model_display = "Haiku"
-    else:
-        model_display = model_full[:15] if model_full else "Unknown"
-
-    # Count actual PDFs and notes from filesystem (more reliable)
-    pdfs_dir = os.path.join(session["path"], "pdfs")
-    actual_pdfs = (
-        len([f for f in os.listdir(pdfs_dir) if f.endswith(".pdf")])
-        if os.path.exists(pdfs_dir)
-        else 0
-    )
-    notes_dir = os.path.join(session["path"], "notes")
-    actual_notes = len(os.listdir(notes_dir)) if os.path.exists(notes_dir) else 0
+    model_full = meta.get("model") or comp.get("model", "Unknown")
+    model_lower = (model_full or "").lower()
+    family = next((f for f in MODEL_FAMILIES if f in model_lower), None)
+    fallback = ("🚀", model_full[:15] if model_full else "Unknown")
+    model_icon, model_display = MODEL_FAMILIES.get(family, fallback)
+
+    stats_pdfs = stats.get("pdfs_read", stats.get("reads", 0))
+    stats_notes = stats.get("notes_saved", stats.get("notes", 0))
 
-    # Use actual counts, fall back to stats if available
-    paper_count = actual_pdfs or stats.get("pdfs_read", stats.get("reads", 0))
-    notes_count = actual_notes or stats.get("notes_saved", stats.get("notes", 0))
+    # Count from the filesystem (already listed by the session view), fall back to stats
+    paper_count = len(view["pdfs"]) or stats_pdfs
+    notes_count = view["notes_count"] or stats_notes
 
     # Enhanced metrics display with icons
     cols = st.columns(5)
     with cols[0]:
-        model_icon = (
-            "🧠"
-            if "opus" in model_full.lower()
-            else "⚡" if "sonnet" in model_full.lower() else "🚀"
-        )
         st.metric(f"{model_icon} Model", model_display)
     with cols[1]:
         duration = comp.get("duration_seconds", 0)
@@ -1022,11 +1209,17 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
     with cols[4]:
         st.metric("📝 Notes", notes_count if notes_count else "—")
 
-    # Tabs
-    tab1, tab2, tab3 = st.tabs(["📄 Report", "📚 PDFs", "💬 Ask Questions"])
+    # Section switcher: unlike st.tabs, only the selected section's body runs
+    section = st.radio(
+        "Section",
+        ["📄 Report", "📚 PDFs", "💬 Ask Questions"],
+        horizontal=True,
+        key=f"section_{folder}",
+        label_visibility="collapsed",
+    )
 
-    with tab1:
-        report = get_session_report(session["path"])
+    if section == "📄 Report":
+        report = view["report"]
         if report:
             st.markdown(report)
 
@@ -1034,16 +1227,13 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
             st.markdown("---")
             with st.expander("📧 Send Report via Email", expanded=False):
                 # Check if SMTP is configured
-                from email_service import EmailConfig
-
-                email_config = EmailConfig.from_env()
-                smtp_configured = email_config.is_smtp_configured()
+                smtp_configured = _email_config().is_smtp_configured()
 
                 if smtp_configured:
                     st.markdown("Enter your email address to receive this report:")
 
                     # Use session-specific key for email input
-                    email_key = f"email_input_{session['folder']}"
+                    email_key = f"email_input_{folder}"
                     recipient_email = st.text_input(
                         "Your email address",
                         key=email_key,
@@ -1055,15 +1245,13 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
                     with col1:
                         send_clicked = st.button(
                             "📤 Send Report",
-                            key=f"send_email_{session['folder']}",
+                            key=f"send_email_{folder}",
                             type="primary",
                             use_container_width=True,
                         )
 
                     if send_clicked:
                         if recipient_email and recipient_email.strip():
-                            from email_service import send_email_report
-
                             with st.spinner("Sending email..."):
                                 success, message = send_email_report(
                                     report_content=report,
@@ -1083,31 +1271,14 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
                     )
         else:
             # No report - check if there are notes to display
-            notes_dir = os.path.join(session["path"], "notes")
-            if os.path.exists(notes_dir) and os.listdir(notes_dir):
+            # Notes come back already grouped by type
+            notes = view["notes"]
+            summaries = notes["summaries"]
+            findings = notes["findings"]
+            other_notes = notes["other"]
+            if summaries or findings or other_notes:
                 st.info("📋 **Research findings from this session:**")
 
-                # Group notes by type
-                findings = []
-                summaries = []
-                other_notes = []
-
-                for note_file in sorted(os.listdir(notes_dir)):
-                    note_path = os.path.join(notes_dir, note_file)
-                    try:
-                        with open(note_path, "r", encoding="utf-8") as f:
-                            note_data = json.load(f)
-                            note_data["_filename"] = note_file
-                            note_type = note_data.get("type", note_data.get("note_type", "other"))
-                            if note_type == "finding":
-                                findings.append(note_data)
-                            elif note_type == "paper_summary":
-                                summaries.append(note_data)
-                            else:
-                                other_notes.append(note_data)
-                    except Exception:
-                        pass
-
                 # Display paper summaries first
                 if summaries:
                     st.markdown("### 📚 Paper Summaries")
@@ -1162,31 +1333,33 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
                     "⏳ This session appears to be empty or still in progress. Try running a new research query."
                 )
 
-    with tab2:
-        pdfs = get_session_pdfs(session["path"])
+    elif section == "📚 PDFs":
+        pdfs = view["pdfs"]
         if not pdfs:
             st.info("📭 No PDFs have been downloaded in this session yet.")
         else:
             st.success(f"📚 **{len(pdfs)} Research Papers Downloaded**")
 
-            # PDF list with better formatting
-            for i, pdf in enumerate(pdfs, 1):
-                col1, col2, col3 = st.columns([0.5, 4.5, 1])
-                with col1:
-                    st.markdown(f"**{i}.**")
-                with col2:
-                    # Clean up PDF name for display
-                    display_name = pdf.replace("_", " ").replace(".pdf", "")
-                    if len(display_name) > 60:
-                        display_name = display_name[:57] + "..."
-                    st.markdown(f"📄 {display_name}")
-                with col3:
-                    pdf_path = get_pdf_path(session["path"], pdf)
-                    if pdf_path:
-                        with open(pdf_path, "rb") as f:
-                            st.download_button(
-                                "⬇️ Download", f.read(), pdf, "application/pdf", key=f"dl_{pdf}"
-                            )
+            # PDF list: one table with static download links when available
+            pdf_table = _pdf_table(folder, pdfs_dir, pdfs)
+            if pdf_table:
+                st.markdown(pdf_table, unsafe_allow_html=True)
+            else:
+                for i, pdf in enumerate(pdfs, 1):
+                    col1, col2, col3 = st.columns([0.5, 4.5, 1])
+                    with col1:
+                        st.markdown(f"**{i}.**")
+                    with col2:
+                        st.markdown(f"📄 {_pdf_display_name(pdf)}")
+                    with col3:
+                        # Just listed from pdfs_dir, so no need to re-check that it exists
+                        st.download_button(
+                            "⬇️ Download",
+                            functools.partial(_read_file_bytes, os.path.join(pdfs_dir, pdf)),
+                            pdf,
+                            "application/pdf",
+                            key=f"dl_{pdf}",
+                        )
 
             # PDF Viewer
             st.markdown("---")
@@ -1195,93 +1368,22 @@ elif st.session_state.current_view == "view_session" and st.session_state.select
                 "Select a paper to view:", ["-- Select a PDF --"] + pdfs, key="pdf_viewer_select"
             )
             if selected_pdf and selected_pdf != "-- Select a PDF --":
-                pdf_path = get_pdf_path(session["path"], selected_pdf)
-                if pdf_path:
-                    with open(pdf_path, "rb") as f:
-                        b64 = base64.b64encode(f.read()).decode()
+                # Listed from pdfs_dir in the cached view, so no need to stat it again
+                if selected_pdf in pdfs:
+                    pdf_path = os.path.join(pdfs_dir, selected_pdf)
+                    src = _static_pdf_url(folder, pdf_path)
+                    if src is None:
+                        pdf_stat = os.stat(pdf_path)
+                        b64 = _pdf_data_uri(pdf_path, pdf_stat.st_size, pdf_stat.st_mtime_ns)
+                        src = f"data:application/pdf;base64,{b64}"
                     st.markdown(
-                        f'<iframe src="data:application/pdf;base64,{b64}" width="100%" height="700px" style="border: 1px solid #ddd; border-radius: 8px;"></iframe>',
+                        f'<iframe src="{src}" width="100%" height="700px" style="border: 1px solid #ddd; border-radius: 8px;"></iframe>',
                         unsafe_allow_html=True,
                     )
 
-    with tab3:
+    else:
         st.markdown("**Ask follow-up questions about this research:**")
-
-        # Session-specific chat
-        chat_key = f"chat_{session['folder']}"
-        if chat_key not in st.session_state:
-            st.session_state[chat_key] = []
-
-        # Display messages
-        for msg in st.session_state[chat_key]:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
-
-        # Chat input
-        if followup := st.chat_input("Ask about the research...", key=f"input_{session['folder']}"):
-            st.session_state[chat_key].append({"role": "user", "content": followup})
-
-            with st.chat_message("user"):
-                st.markdown(followup)
-
-            with st.chat_message("assistant"):
-                placeholder = st.empty()
-                response_container = [""]  # Use mutable container for async access
-
-                # Show spinner while processing
-                with st.spinner("💭 Thinking..."):
-                    try:
-                        import concurrent.futures
-
-                        # Capture values before entering thread
-                        followup_history = list(st.session_state[chat_key][:-1])
-                        sess_path = session["path"]
-                        sess_model = session.get("metadata", {}).get("model")
-
-                        def run_followup_chat(user_followup, history, path, followup_model):
-                            """Run the async followup chat using anyio."""
-                            import anyio
-
-                            # Set Windows event loop policy for subprocess support
-                            if sys.platform == "win32":
-                                asyncio.set_event_loop_policy(
-                                    asyncio.WindowsProactorEventLoopPolicy()
-                                )
-
-                            async def collect_followup():
-                                result = ""
-                                async for chunk in chat_with_agent(
-                                    user_followup,
-                                    history,
-                                    mode="followup",
-                                    research_session_path=path,
-                                    model=followup_model,
-                                ):
-                                    result += chunk
-                                return result
-
-                            return anyio.run(
-                                collect_followup,
-                                backend="asyncio",
-                                backend_options={"use_uvloop": False},
-                            )
-
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future = executor.submit(
-                                run_followup_chat, followup, followup_history, sess_path, sess_model
-                            )
-                            response_container[0] = future.result(timeout=300)
-
-                        placeholder.markdown(response_container[0])
-
-                    except Exception as e:
-                        error_details = traceback.format_exc()
-                        response_container[0] = f"Error: {str(e)}\n\n```\n{error_details}\n```"
-                        placeholder.markdown(response_container[0])
-
-                st.session_state[chat_key].append(
-                    {"role": "assistant", "content": response_container[0]}
-                )
+        _followup_chat(session)
 
 
 # =============================================================================
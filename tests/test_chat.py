@@ -9,6 +9,18 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="repla
 
 from chat_research_agent import quick_research_chat
 
+# Emojis -> text equivalents for the Windows console, applied in one pass per chunk
+EMOJI_TABLE = str.maketrans(
+    {
+        "🔍": "[SEARCH]",
+        "📥": "[DOWNLOAD]",
+        "📖": "[READ]",
+        "📝": "[NOTE]",
+        "📄": "[REPORT]",
+        "❌": "[ERROR]",
+    }
+)
+
 
 async def main():
     print("=" * 60)
@@ -22,12 +34,7 @@ async def main():
 
     def on_message(chunk):
         # Replace emojis with text equivalents for Windows console
-        chunk = chunk.replace("🔍", "[SEARCH]")
-        chunk = chunk.replace("📥", "[DOWNLOAD]")
-        chunk = chunk.replace("📖", "[READ]")
-        chunk = chunk.replace("📝", "[NOTE]")
-        chunk = chunk.replace("📄", "[REPORT]")
-        chunk = chunk.replace("❌", "[ERROR]")
+        chunk = chunk.translate(EMOJI_TABLE)
         print(chunk, end="", flush=True)
 
     result = await quick_research_chat(
@@ -8,6 +8,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from chat_research_agent import chat_with_agent
 
+# Emojis -> text equivalents for the Windows console, applied in one pass per chunk
+EMOJI_TABLE = str.maketrans(
+    {
+        "\U0001f50d": "[SEARCH]",
+        "\U0001f4e5": "[DOWNLOAD]",
+        "\U0001f4d6": "[READ]",
+        "\U0001f4dd": "[NOTE]",
+        "\U0001f4c4": "[REPORT]",
+        "\u274c": "[ERROR]",
+    }
+)
+
 
 async def test_chat():
     print("Testing chat agent...")
@@ -22,12 +34,7 @@ async def test_chat():
             research_session_path=None,
         ):
             # Replace emojis for Windows console
-            chunk = chunk.replace("\U0001f50d", "[SEARCH]")
-            chunk = chunk.replace("\U0001f4e5", "[DOWNLOAD]")
-            chunk = chunk.replace("\U0001f4d6", "[READ]")
-            chunk = chunk.replace("\U0001f4dd", "[NOTE]")
-            chunk = chunk.replace("\U0001f4c4", "[REPORT]")
-            chunk = chunk.replace("\u274c", "[ERROR]")
+            chunk = chunk.translate(EMOJI_TABLE)
             print(chunk, end="", flush=True)
             response_text += chunk
 
@@ -5,6 +5,7 @@ These tests use mocks to avoid requiring API keys in CI.
 Tests call the implementation functions directly (_*_impl functions).
 """
 
+import asyncio
 import json
 import os
 
@@ -22,15 +23,34 @@ from web_research_tools import (
     _arxiv_search_impl,
     _download_pdfs_impl,
     _extract_filename_from_url,
+    _extract_pdf_text,
+    _get_arxiv_client,
+    _get_tavily_client,
     _is_pdf_url,
+    _multi_search_impl,
     _read_notes_impl,
     _read_pdf_impl,
     _save_note_impl,
+    _search_cache,
     _web_search_impl,
     _write_report_impl,
+    count_notes,
+    load_notes,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_client_caches():
+    """Drop cached API clients and search results so each test sees its own mocks."""
+    _get_tavily_client.cache_clear()
+    _get_arxiv_client.cache_clear()
+    _search_cache.clear()
+    yield
+    _get_tavily_client.cache_clear()
+    _get_arxiv_client.cache_clear()
+    _search_cache.clear()
+
+
 class TestResearchConfig:
     """Tests for ResearchConfig class."""
 
@@ -82,6 +102,13 @@ class TestResearchConfig:
         # Folder name should be reasonable length (timestamp + truncated topic)
         assert len(folder_name) < 80
 
+    def test_download_concurrency(self):
+        """Test setting the download concurrency limit."""
+        ResearchConfig.set_download_concurrency(3)
+        assert ResearchConfig.get_download_concurrency() == 3
+        ResearchConfig.set_download_concurrency(0)
+        assert ResearchConfig.get_download_concurrency() == 1
+
     def test_get_pdfs_dir(self, tmp_path):
         """Test getting PDFs directory."""
         test_dir = str(tmp_path / "session")
@@ -100,6 +127,20 @@ class TestResearchConfig:
         notes_dir = ResearchConfig.get_notes_dir()
         assert notes_dir == os.path.join(test_dir, "notes")
 
+    @pytest.mark.asyncio
+    async def test_output_dir_is_per_task(self, tmp_path):
+        """Test that concurrent sessions on one event loop keep their own folders."""
+
+        async def session(name: str) -> str:
+            ResearchConfig.set_output_dir(str(tmp_path / name))
+            await asyncio.sleep(0)  # Let the other session set its folder
+            return ResearchConfig.get_output_dir()
+
+        first, second = await asyncio.gather(session("first"), session("second"))
+
+        assert first == str(tmp_path / "first")
+        assert second == str(tmp_path / "second")
+
 
 class TestHelperFunctions:
     """Tests for helper functions."""
@@ -138,7 +179,7 @@ class TestSaveNote:
 
     @pytest.mark.asyncio
     async def test_save_note_creates_file(self, tmp_path):
-        """Test that save_note creates a JSON file."""
+        """Test that save_note creates the notes JSONL file."""
         session_dir = str(tmp_path / "session")
         os.makedirs(os.path.join(session_dir, "notes"), exist_ok=True)
         ResearchConfig.set_output_dir(session_dir)
@@ -158,8 +199,7 @@ class TestSaveNote:
         # Verify file was created
         notes_dir = os.path.join(session_dir, "notes")
         files = os.listdir(notes_dir)
-        assert len(files) == 1
-        assert files[0].endswith(".json")
+        assert files == ["notes.jsonl"]
 
     @pytest.mark.asyncio
     async def test_save_note_content(self, tmp_path):
@@ -177,11 +217,11 @@ class TestSaveNote:
             }
         )
 
-        # Read the saved file
-        notes_dir = os.path.join(session_dir, "notes")
-        files = os.listdir(notes_dir)
-        with open(os.path.join(notes_dir, files[0])) as f:
-            note = json.load(f)
+        # Read the saved line
+        with open(os.path.join(session_dir, "notes", "notes.jsonl")) as f:
+            lines = f.readlines()
+        assert len(lines) == 1
+        note = json.loads(lines[0])
 
         assert note["title"] == "Key Finding"
         assert note["content"] == "Important discovery about AI."
@@ -222,6 +262,81 @@ class TestReadNotes:
 
         assert "content" in result
         assert "3 notes" in result["content"][0]["text"]
+        with open(os.path.join(session_dir, "notes", "notes.jsonl")) as f:
+            assert len(f.readlines()) == 3
+
+    @pytest.mark.asyncio
+    async def test_read_notes_filters_by_type(self, tmp_path):
+        """Test reading only notes of one type, across legacy files and JSONL."""
+        session_dir = str(tmp_path / "session")
+        notes_dir = os.path.join(session_dir, "notes")
+        os.makedirs(notes_dir, exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        with open(os.path.join(notes_dir, "20250101_000000_insight_Old.json"), "w") as f:
+            json.dump({"type": "insight", "title": "Old insight", "content": "Legacy"}, f)
+        with open(os.path.join(notes_dir, "20250101_000001_finding_Old.json"), "w") as f:
+            json.dump({"type": "finding", "title": "Old finding", "content": "Legacy"}, f)
+
+        await _save_note_impl({"note_type": "finding", "title": "New finding", "content": "A"})
+        # Mentions the filter value without being of that type
+        await _save_note_impl({"note_type": "synthesis", "title": "finding", "content": "B"})
+        result = await _read_notes_impl({"note_type": "finding"})
+
+        text = result["content"][0]["text"]
+        assert "2 notes" in text
+        assert "Old finding" in text and "New finding" in text
+        assert "Old insight" not in text and "[SYNTHESIS]" not in text
+
+    @pytest.mark.asyncio
+    async def test_read_notes_includes_legacy_files(self, tmp_path):
+        """Test that per-note JSON files from older sessions are still read."""
+        session_dir = str(tmp_path / "session")
+        notes_dir = os.path.join(session_dir, "notes")
+        os.makedirs(notes_dir, exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        with open(os.path.join(notes_dir, "20250101_000000_finding_Old.json"), "w") as f:
+            json.dump({"type": "finding", "title": "Old note", "content": "Legacy"}, f)
+
+        await _save_note_impl({"note_type": "insight", "title": "New note", "content": "Fresh"})
+        result = await _read_notes_impl({})
+
+        text = result["content"][0]["text"]
+        assert "2 notes" in text
+        assert text.index("Old note") < text.index("New note")
+
+
+class TestLoadNotes:
+    """Tests for load_notes and count_notes."""
+
+    def test_on_error_stands_in_for_bad_notes(self, tmp_path):
+        """Test that unparseable notes go through on_error instead of raising."""
+        notes_dir = tmp_path / "notes"
+        notes_dir.mkdir()
+        (notes_dir / "20250101_000000_finding_Old.json").write_text("{not json")
+        (notes_dir / "notes.jsonl").write_text('{"type": "finding", "title": "Ok"}\n{broken\n')
+
+        with pytest.raises(ValueError):
+            load_notes(str(notes_dir))
+
+        notes = load_notes(str(notes_dir), on_error=lambda label, e: {"title": label})
+        assert [n["title"] for n in notes] == [
+            "20250101_000000_finding_Old.json",
+            "Ok",
+            "notes.jsonl:2",
+        ]
+        assert load_notes(str(notes_dir), on_error=lambda label, e: None) == [
+            {"type": "finding", "title": "Ok"}
+        ]
+
+    def test_count_notes(self, tmp_path):
+        """Test counting legacy files and JSON lines without parsing them."""
+        notes_dir = tmp_path / "notes"
+        assert count_notes(str(notes_dir)) == 0
+
+        notes_dir.mkdir()
+        (notes_dir / "20250101_000000_finding_Old.json").write_text("{not json")
+        (notes_dir / "notes.jsonl").write_text('{"title": "A"}\n\n{"title": "B"}\n')
+        assert count_notes(str(notes_dir)) == 3
 
 
 class TestWriteReport:
@@ -270,6 +385,32 @@ class TestWriteReport:
         assert "Generated:" in content
 
 
+def _minimal_pdf(text: str) -> bytes:
+    """Build a one-page PDF that draws text in Helvetica."""
+    stream = f"BT /F1 24 Tf 72 700 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return pdf
+
+
 class TestReadPdf:
     """Tests for _read_pdf_impl function."""
 
@@ -285,6 +426,76 @@ class TestReadPdf:
         assert result.get("is_error") is True
         assert "not found" in result["content"][0]["text"].lower()
 
+    @pytest.mark.asyncio
+    async def test_read_pdf_extracts_text(self, tmp_path):
+        """Test extracting text from a real PDF."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        with open(os.path.join(session_dir, "pdfs", "paper.pdf"), "wb") as f:
+            f.write(_minimal_pdf("Attention is all you need"))
+
+        result = await _read_pdf_impl({"filename": "paper"})
+
+        text = result["content"][0]["text"]
+        assert "is_error" not in result
+        assert "Pages: 1/1" in text
+        assert "Attention is all you need" in text
+
+    @pytest.mark.asyncio
+    async def test_read_pdf_splits_pages_across_workers(self, tmp_path):
+        """Test that pages extracted in separate batches come back in order."""
+        import pypdfium2 as pdfium
+
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        pdf = pdfium.PdfDocument.new()
+        for word in ("alpha", "beta", "gamma"):
+            pdf.import_pages(pdfium.PdfDocument(_minimal_pdf(word)))
+        pdf.save(os.path.join(session_dir, "pdfs", "paper.pdf"))
+
+        with patch("web_research_tools.PDF_PAGES_PER_TASK", 1):
+            result = await _read_pdf_impl({"filename": "paper"})
+
+        text = result["content"][0]["text"]
+        assert "Pages: 3/3" in text
+        assert text.index("alpha") < text.index("beta") < text.index("gamma")
+
+    @pytest.mark.asyncio
+    async def test_extract_pdf_text_stops_at_char_limit(self, tmp_path):
+        """Test that extraction stops once the text limit is exceeded."""
+        import pypdfium2 as pdfium
+
+        path = str(tmp_path / "paper.pdf")
+        pdf = pdfium.PdfDocument.new()
+        for word in ("alpha", "beta", "gamma"):
+            pdf.import_pages(pdfium.PdfDocument(_minimal_pdf(word)))
+        pdf.save(path)
+
+        with patch("web_research_tools.PDF_PAGES_PER_TASK", 1):
+            pages, total_pages = await _extract_pdf_text(path, None, char_limit=1)
+
+        assert total_pages == 3
+        assert len(pages) == 1
+        assert "alpha" in pages[0]
+
+    @pytest.mark.asyncio
+    async def test_read_pdf_uses_text_cache(self, tmp_path):
+        """Test that re-reading an unchanged PDF skips extraction."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        with open(os.path.join(session_dir, "pdfs", "paper.pdf"), "wb") as f:
+            f.write(_minimal_pdf("Cached text"))
+
+        first = await _read_pdf_impl({"filename": "paper"})
+        with patch("web_research_tools._get_pdf_executor", side_effect=AssertionError):
+            second = await _read_pdf_impl({"filename": "paper"})
+
+        assert second == first
+        assert sorted(os.listdir(os.path.join(session_dir, "pdfs"))) == [".cache", "paper.pdf"]
+
 
 class TestWebSearch:
     """Tests for _web_search_impl function with mocked API."""
@@ -330,6 +541,35 @@ class TestWebSearch:
                 assert "Found 2 results" in result["content"][0]["text"]
                 assert "Test Paper 1" in result["content"][0]["text"]
 
+    @pytest.mark.asyncio
+    async def test_web_search_reuses_client(self):
+        """Test that repeated searches share one TavilyClient."""
+        with patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}):
+            with patch("web_research_tools.TavilyClient") as MockClient:
+                MockClient.return_value.search.return_value = {"results": []}
+
+                await _web_search_impl({"query": "first"})
+                await _web_search_impl({"query": "second"})
+
+                MockClient.assert_called_once_with(api_key="test-key")
+
+    @pytest.mark.asyncio
+    async def test_web_search_caches_results(self):
+        """Test that an identical search is answered from the cache."""
+        with patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}):
+            with patch("web_research_tools.TavilyClient") as MockClient:
+                search = MockClient.return_value.search
+                search.return_value = {
+                    "results": [{"title": "Cached Paper", "url": "https://x.org/a.pdf"}]
+                }
+
+                first = await _web_search_impl({"query": "transformers"})
+                second = await _web_search_impl({"query": "transformers"})
+                await _web_search_impl({"query": "transformers", "max_results": 5})
+
+                assert second == first
+                assert search.call_count == 2
+
 
 class TestArxivSearch:
     """Tests for _arxiv_search_impl function with mocked ArXiv API."""
@@ -444,6 +684,65 @@ class TestArxivSearch:
             assert "ArXiv search error" in result["content"][0]["text"]
 
 
+class TestMultiSearch:
+    """Tests for _multi_search_impl function."""
+
+    @pytest.mark.asyncio
+    async def test_multi_search_combines_sources(self):
+        """Test that web and ArXiv results are returned together."""
+        with patch.dict(os.environ, {"TAVILY_API_KEY": "test-key"}):
+            with patch("web_research_tools.TavilyClient") as MockClient:
+                MockClient.return_value.search.return_value = {
+                    "results": [{"title": "Web Paper", "url": "https://x.org/a.pdf"}]
+                }
+                with patch("web_research_tools.arxiv.Client") as mock_client_class:
+                    with patch("web_research_tools.arxiv.Search"):
+                        mock_client_class.return_value.results.return_value = []
+
+                        result = await _multi_search_impl({"query": "transformers"})
+
+        texts = [block["text"] for block in result["content"]]
+        assert len(texts) == 2
+        assert "Web Paper" in texts[0]
+        assert "No ArXiv papers found" in texts[1]
+        assert "is_error" not in result
+
+    @pytest.mark.asyncio
+    async def test_multi_search_error_when_both_fail(self):
+        """Test that multi_search only errors when both sources fail."""
+        with patch.dict(os.environ, {}, clear=True):
+            with patch("web_research_tools.arxiv.Client") as mock_client_class:
+                mock_client_class.side_effect = Exception("ArXiv down")
+
+                result = await _multi_search_impl({"query": "transformers"})
+
+        assert result.get("is_error") is True
+
+
+def _mock_stream_client(body=b"%PDF-1.4 fake pdf content", content_type="application/pdf"):
+    """Build a mocked httpx.AsyncClient whose stream() yields body in one chunk (none if empty)."""
+
+    async def aiter_bytes(chunk_size=None):
+        if body:
+            yield body
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": content_type}
+    mock_response.raise_for_status = MagicMock()
+    mock_response.aiter_bytes = aiter_bytes
+
+    mock_stream = AsyncMock()
+    mock_stream.__aenter__.return_value = mock_response
+    mock_stream.__aexit__.return_value = None
+
+    mock_client = AsyncMock()
+    mock_client.stream = MagicMock(return_value=mock_stream)
+    mock_client.__aenter__.return_value = mock_client
+    mock_client.__aexit__.return_value = None
+    return mock_client
+
+
 class TestDownloadPdfs:
     """Tests for _download_pdfs_impl function with mocked HTTP."""
 
@@ -465,22 +764,16 @@ class TestDownloadPdfs:
         os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
         ResearchConfig.set_output_dir(session_dir)
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 fake pdf content"
-        mock_response.headers = {"content-type": "application/pdf"}
-        mock_response.raise_for_status = MagicMock()
-
         with patch("web_research_tools.httpx.AsyncClient") as MockClient:
-            mock_client = AsyncMock()
-            mock_client.get.return_value = mock_response
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            MockClient.return_value = mock_client
+            MockClient.return_value = _mock_stream_client()
 
             result = await _download_pdfs_impl({"urls": ["https://example.com/paper.pdf"]})
 
             assert "Successful: 1" in result["content"][0]["text"]
+            pdfs_dir = os.path.join(session_dir, "pdfs")
+            assert os.listdir(pdfs_dir) == ["paper.pdf"]
+            with open(os.path.join(pdfs_dir, "paper.pdf"), "rb") as f:
+                assert f.read() == b"%PDF-1.4 fake pdf content"
 
     @pytest.mark.asyncio
     async def test_download_pdfs_failure(self, tmp_path):
@@ -490,16 +783,97 @@ class TestDownloadPdfs:
         ResearchConfig.set_output_dir(session_dir)
 
         with patch("web_research_tools.httpx.AsyncClient") as MockClient:
-            mock_client = AsyncMock()
-            mock_client.get.side_effect = Exception("Connection failed")
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
+            mock_client = _mock_stream_client()
+            mock_client.stream.side_effect = Exception("Connection failed")
             MockClient.return_value = mock_client
 
             result = await _download_pdfs_impl({"urls": ["https://example.com/paper.pdf"]})
 
             assert "Failed: 1" in result["content"][0]["text"]
 
+    @pytest.mark.asyncio
+    async def test_download_pdfs_not_a_pdf(self, tmp_path):
+        """Test that non-PDF responses are rejected without leaving a partial file."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+
+        with patch("web_research_tools.httpx.AsyncClient") as MockClient:
+            MockClient.return_value = _mock_stream_client(b"<html></html>", "text/html")
+
+            result = await _download_pdfs_impl({"urls": ["https://example.com/landing"]})
+
+            assert "Not a PDF" in result["content"][0]["text"]
+            assert os.listdir(os.path.join(session_dir, "pdfs")) == []
+
+    @pytest.mark.asyncio
+    async def test_download_pdfs_empty_non_pdf(self, tmp_path):
+        """Test that an empty non-PDF response is rejected rather than saved as 0 bytes."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+
+        with patch("web_research_tools.httpx.AsyncClient") as MockClient:
+            MockClient.return_value = _mock_stream_client(b"", "text/html")
+
+            result = await _download_pdfs_impl({"urls": ["https://example.com/landing"]})
+
+            assert "Failed: 1" in result["content"][0]["text"]
+            assert "Not a PDF" in result["content"][0]["text"]
+            assert os.listdir(os.path.join(session_dir, "pdfs")) == []
+
+    @pytest.mark.asyncio
+    async def test_download_pdfs_multiple_urls(self, tmp_path):
+        """Test downloading several PDFs concurrently."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+        ResearchConfig.set_download_concurrency(2)
+
+        with patch("web_research_tools.httpx.AsyncClient") as MockClient:
+            MockClient.return_value = _mock_stream_client()
+
+            urls = [f"https://example.com/paper{i}.pdf" for i in range(5)]
+            result = await _download_pdfs_impl({"urls": urls})
+
+            assert "Successful: 5" in result["content"][0]["text"]
+            assert len(os.listdir(os.path.join(session_dir, "pdfs"))) == 5
+
+    @pytest.mark.asyncio
+    async def test_download_pdfs_deduplicates_urls(self, tmp_path):
+        """Test that a URL repeated in one call is fetched once."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+
+        with patch("web_research_tools.httpx.AsyncClient") as MockClient:
+            mock_client = _mock_stream_client()
+            MockClient.return_value = mock_client
+
+            url = "https://example.com/paper.pdf"
+            result = await _download_pdfs_impl({"urls": [url, url, f" {url} "]})
+
+            assert "Total: 1, Successful: 1" in result["content"][0]["text"]
+            assert mock_client.stream.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_download_pdfs_urls_for_same_file(self, tmp_path):
+        """Test that different URLs saving to one filename are not downloaded concurrently."""
+        session_dir = str(tmp_path / "session")
+        os.makedirs(os.path.join(session_dir, "pdfs"), exist_ok=True)
+        ResearchConfig.set_output_dir(session_dir)
+
+        with patch("web_research_tools.httpx.AsyncClient") as MockClient:
+            mock_client = _mock_stream_client()
+            MockClient.return_value = mock_client
+
+            urls = ["http://arxiv.org/pdf/2301.00001", "https://arxiv.org/pdf/2301.00001.pdf"]
+            result = await _download_pdfs_impl({"urls": urls})
+
+            assert "Total: 1, Successful: 1, Failed: 0" in result["content"][0]["text"]
+            assert mock_client.stream.call_count == 1
+            assert os.listdir(os.path.join(session_dir, "pdfs")) == ["2301.00001.pdf"]
+
 
 class TestIntegration:
     """Integration tests for the research workflow."""
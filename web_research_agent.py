@@ -21,6 +21,11 @@ from claude_agent_sdk import (
 
 from web_research_tools import ResearchConfig, web_research_tools_server
 
+try:
+    import orjson
+except ImportError:  # Optional; stdlib json is the fallback
+    orjson = None
+
 # =============================================================================
 # Research Request Data Structure
 # =============================================================================
@@ -175,8 +180,7 @@ async def run_web_research(
         "model": request.model or "claude-sonnet-4-20250514",  # Default model
         "created_at": datetime.now().isoformat(),
     }
-    with open(os.path.join(session_dir, "metadata.json"), "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    write_session_json(os.path.join(session_dir, "metadata.json"), metadata)
 
     # Initialize progress
     progress = ResearchProgress(status="running", phase="Starting research...")
@@ -230,7 +234,7 @@ async def run_web_research(
                             if tool_name.startswith("mcp__research__"):
                                 tool_name = tool_name.replace("mcp__research__", "")
 
-                            if tool_name == "web_search":
+                            if tool_name in ("web_search", "multi_search"):
                                 progress.searches += 1
                                 query = block.input.get("query", "")[:50]
                                 progress.current_action = f"Searching: {query}..."
@@ -283,7 +287,7 @@ async def run_web_research(
 
                     # Save completion metadata
                     completion_data = {
-                        "completed_at": datetime.now().isoformat(),
+                        "completed_at": end_time.isoformat(),
                         "duration_seconds": total_time,
                         "api_duration_seconds": duration_sec,
                         "cost_usd": cost,
@@ -296,8 +300,9 @@ async def run_web_research(
                             "report_generated": progress.report_generated,
                         },
                     }
-                    with open(os.path.join(session_dir, "completion.json"), "w") as f:
-                        json.dump(completion_data, f, indent=2)
+                    write_session_json(
+                        os.path.join(session_dir, "completion.json"), completion_data
+                    )
 
                     update_progress()
 
@@ -343,6 +348,35 @@ async def run_web_research(
 # =============================================================================
 
 
+PDF_SUFFIX = ".pdf"
+
+
+def write_session_json(path: str, data: dict) -> None:
+    """Write a session JSON file (metadata.json, completion.json) as indented UTF-8.
+
+    The data goes to a temp file that is swapped in, so readers never see a partial file.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _list_pdfs(pdfs_dir: str) -> list[str]:
+    """Names of the PDFs in a folder, skipping hidden files; empty if it doesn't exist."""
+    try:
+        with os.scandir(pdfs_dir) as it:
+            return [
+                e.name for e in it if e.name.endswith(PDF_SUFFIX) and not e.name.startswith(".")
+            ]
+    except FileNotFoundError:
+        return []
+
+
 def list_research_sessions(base_dir: str = "research_sessions") -> list[dict]:
     """List all research sessions with metadata."""
     sessions = []
@@ -364,24 +398,20 @@ def list_research_sessions(base_dir: str = "research_sessions") -> list[dict]:
         # Load metadata if exists
         metadata_path = os.path.join(folder_path, "metadata.json")
         if os.path.exists(metadata_path):
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                session["metadata"] = json.load(f)
+            with open(metadata_path, "rb") as f:
+                session["metadata"] = (orjson or json).loads(f.read())
 
         # Load completion data if exists
         completion_path = os.path.join(folder_path, "completion.json")
         if os.path.exists(completion_path):
-            with open(completion_path, "r", encoding="utf-8") as f:
-                session["completion"] = json.load(f)
+            with open(completion_path, "rb") as f:
+                session["completion"] = (orjson or json).loads(f.read())
 
         # Check for report
         session["has_report"] = os.path.exists(os.path.join(folder_path, "report.md"))
 
         # List PDFs
-        pdfs_dir = os.path.join(folder_path, "pdfs")
-        if os.path.exists(pdfs_dir):
-            session["pdfs"] = [f for f in os.listdir(pdfs_dir) if f.endswith(".pdf")]
-        else:
-            session["pdfs"] = []
+        session["pdfs"] = _list_pdfs(os.path.join(folder_path, "pdfs"))
 
         sessions.append(session)
 
@@ -390,19 +420,16 @@ def list_research_sessions(base_dir: str = "research_sessions") -> list[dict]:
 
 def get_session_report(session_path: str) -> str | None:
     """Get the report content for a session."""
-    report_path = os.path.join(session_path, "report.md")
-    if os.path.exists(report_path):
-        with open(report_path, "r", encoding="utf-8") as f:
+    try:
+        with open(os.path.join(session_path, "report.md"), "r", encoding="utf-8") as f:
             return f.read()
-    return None
+    except FileNotFoundError:
+        return None
 
 
 def get_session_pdfs(session_path: str) -> list[str]:
     """Get list of PDFs in a session."""
-    pdfs_dir = os.path.join(session_path, "pdfs")
-    if os.path.exists(pdfs_dir):
-        return [f for f in os.listdir(pdfs_dir) if f.endswith(".pdf")]
-    return []
+    return _list_pdfs(os.path.join(session_path, "pdfs"))
 
 
 def get_pdf_path(session_path: str, filename: str) -> str | None:
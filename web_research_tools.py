@@ -4,52 +4,132 @@ Web Research Tools with Configurable Output Directory
 Tools for the web-based autonomous research agent with per-session folder support.
 """
 
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import importlib
+import importlib.util
 import json
+import multiprocessing
 import os
 import re
+import tempfile
 import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable
 from urllib.parse import unquote, urlparse
 
-import arxiv
 import httpx
-import pdfplumber
 from claude_agent_sdk import create_sdk_mcp_server, tool
-from tavily import TavilyClient
+
+try:
+    import orjson
+except ImportError:  # Optional; stdlib json is the fallback
+    orjson = None
+
+if TYPE_CHECKING:
+    import arxiv
+    from tavily import TavilyClient
+
+# Heavy third-party imports, deferred until a tool needs them so that importing
+# this module (e.g. just to save notes) stays cheap: attribute name -> (module, member)
+_LAZY_IMPORTS = {
+    "arxiv": ("arxiv", None),
+    "pdfium": ("pypdfium2", None),
+    "TavilyClient": ("tavily", "TavilyClient"),
+}
+
+
+def __getattr__(name: str):
+    """Resolve a deferred import on first access and keep it as a module global."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, member = _LAZY_IMPORTS[name]
+    value = importlib.import_module(module_name)
+    if member:
+        value = getattr(value, member)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str):
+    """A deferred import, honouring anything already bound (or patched) on the module."""
+    try:
+        return globals()[name]
+    except KeyError:
+        return __getattr__(name)
+
 
 # =============================================================================
-# Configuration - Thread-safe output directory management
+# Configuration - Per-session output directory management
 # =============================================================================
 
+# Anything but letters, digits, spaces, hyphens and underscores
+UNSAFE_TOPIC_CHARS = re.compile(r"[^\w -]")
+
 
 class ResearchConfig:
-    """Thread-safe configuration for research sessions."""
+    """Per-session configuration for research tools.
+
+    Settings live in context variables, so each asyncio task (and each thread)
+    running a session sees its own values, even when several sessions share
+    one event loop.
+    """
 
-    _local = threading.local()
     _default_base_dir = "research_sessions"
+    _default_download_concurrency = 8
+    # (output dir, pdfs dir, notes dir): subdirectory paths only change with the
+    # output dir, so they are joined once when it is set
+    _dirs: ContextVar[tuple[str, str, str]] = ContextVar(
+        "research_dirs",
+        default=(
+            _default_base_dir,
+            os.path.join(_default_base_dir, "pdfs"),
+            os.path.join(_default_base_dir, "notes"),
+        ),
+    )
+    _download_concurrency: ContextVar[int] = ContextVar(
+        "research_download_concurrency", default=_default_download_concurrency
+    )
 
     @classmethod
     def set_output_dir(cls, output_dir: str):
         """Set the output directory for the current session."""
-        cls._local.output_dir = output_dir
+        pdfs_dir = os.path.join(output_dir, "pdfs")
+        notes_dir = os.path.join(output_dir, "notes")
+        cls._dirs.set((output_dir, pdfs_dir, notes_dir))
         # Create subdirectories
-        os.makedirs(os.path.join(output_dir, "pdfs"), exist_ok=True)
-        os.makedirs(os.path.join(output_dir, "notes"), exist_ok=True)
+        os.makedirs(pdfs_dir, exist_ok=True)
+        os.makedirs(notes_dir, exist_ok=True)
 
     @classmethod
     def get_output_dir(cls) -> str:
         """Get the current output directory."""
-        return getattr(cls._local, "output_dir", cls._default_base_dir)
+        return cls._dirs.get()[0]
+
+    @classmethod
+    def set_download_concurrency(cls, limit: int):
+        """Set how many PDFs the current session downloads at once."""
+        cls._download_concurrency.set(max(1, limit))
+
+    @classmethod
+    def get_download_concurrency(cls) -> int:
+        """Get the PDF download concurrency limit for the current session."""
+        return cls._download_concurrency.get()
 
     @classmethod
     def get_pdfs_dir(cls) -> str:
         """Get the PDFs subdirectory."""
-        return os.path.join(cls.get_output_dir(), "pdfs")
+        return cls._dirs.get()[1]
 
     @classmethod
     def get_notes_dir(cls) -> str:
         """Get the notes subdirectory."""
-        return os.path.join(cls.get_output_dir(), "notes")
+        return cls._dirs.get()[2]
 
     @classmethod
     def create_session_folder(cls, topic: str, base_dir: str = "research_sessions") -> str:
@@ -58,7 +138,7 @@ class ResearchConfig:
 
         # Create safe folder name
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_topic = "".join(c if c.isalnum() or c in " -_" else "_" for c in topic)[:50]
+        safe_topic = UNSAFE_TOPIC_CHARS.sub("_", topic[:50])
         folder_name = f"{timestamp}_{safe_topic}"
 
         output_dir = os.path.join(base_dir, folder_name)
@@ -72,13 +152,96 @@ class ResearchConfig:
 # =============================================================================
 
 
+# A .pdf extension (optionally followed by a query or fragment), a /pdf/ path
+# segment (arxiv.org/pdf/...) or a download link mentioning pdf
+PDF_URL_PATTERN = re.compile(r"\.pdf(?:$|[?#])|/pdf/|download.*pdf", re.IGNORECASE)
+
+
 def _is_pdf_url(url: str) -> bool:
     """Check if a URL likely points to a PDF document."""
-    url_lower = url.lower()
-    if url_lower.endswith(".pdf"):
-        return True
-    pdf_patterns = [r"\.pdf\?", r"\.pdf#", r"/pdf/", r"arxiv\.org/pdf/", r"download.*pdf"]
-    return any(re.search(pattern, url_lower) for pattern in pdf_patterns)
+    return PDF_URL_PATTERN.search(url) is not None
+
+
+# Scholarly sources web_search is restricted to
+SCHOLARLY_DOMAINS = (
+    "arxiv.org",
+    "scholar.google.com",
+    "pubmed.ncbi.nlm.nih.gov",
+    "ncbi.nlm.nih.gov",
+    "sciencedirect.com",
+    "nature.com",
+    "science.org",
+    "ieee.org",
+    "acm.org",
+    "researchgate.net",
+    "semanticscholar.org",
+    "biorxiv.org",
+    "medrxiv.org",
+    "plos.org",
+    "frontiersin.org",
+    "mdpi.com",
+    "springer.com",
+    "wiley.com",
+    "cell.com",
+)
+
+
+# Agents often repeat a search within a session; identical searches reuse the
+# rendered result for a while instead of calling the (rate-limited) API again
+SEARCH_CACHE_TTL = 600  # seconds
+SEARCH_CACHE_SIZE = 128
+_search_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+# Searches run on worker threads and on each session's event loop
+_search_cache_lock = threading.Lock()
+
+
+def _get_cached_search(key: tuple) -> str | None:
+    """Rendered search result for key, if one was stored within the TTL."""
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > SEARCH_CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_search(key: tuple, text: str):
+    """Store a rendered search result, evicting the least recently used beyond the cap."""
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic(), text)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_tavily_client(api_key: str) -> "TavilyClient":
+    """One TavilyClient per API key, so searches reuse its HTTP session."""
+    return _lazy("TavilyClient")(api_key=api_key)
+
+
+def _format_web_results(query: str, results: list[dict]):
+    """Yield the lines of web_search's output for a list of Tavily results."""
+    urls = [r.get("url", "") for r in results]
+    pdf_urls = [url for url in urls if _is_pdf_url(url)]
+    pdf_url_set = set(pdf_urls)
+
+    yield f"Found {len(results)} results for: {query}\n"
+    if pdf_urls:
+        yield f"PDF URLs found: {len(pdf_urls)}\n"
+
+    for i, (result, url) in enumerate(zip(results, urls), 1):
+        is_pdf = "📄 [PDF]" if url in pdf_url_set else ""
+        yield f"\n{i}. {result.get('title', 'No title')} {is_pdf}"
+        yield f"   URL: {url}"
+        yield f"   {result.get('content', '')[:200]}..."
+
+    if pdf_urls:
+        yield "\n\nPDF URLs for download:"
+        yield from (f"  - {url}" for url in pdf_urls)
 
 
 async def _web_search_impl(args: dict) -> dict:
@@ -93,58 +256,33 @@ async def _web_search_impl(args: dict) -> dict:
             "is_error": True,
         }
 
+    cache_key = ("web", query, max_results)
+    cached = _get_cached_search(cache_key)
+    if cached is not None:
+        return {"content": [{"type": "text", "text": cached}]}
+
     try:
-        client = TavilyClient(api_key=api_key)
+        client = _get_tavily_client(api_key)
         enhanced_query = f"{query} research paper PDF academic"
 
-        include_domains = [
-            "arxiv.org",
-            "scholar.google.com",
-            "pubmed.ncbi.nlm.nih.gov",
-            "ncbi.nlm.nih.gov",
-            "sciencedirect.com",
-            "nature.com",
-            "science.org",
-            "ieee.org",
-            "acm.org",
-            "researchgate.net",
-            "semanticscholar.org",
-            "biorxiv.org",
-            "medrxiv.org",
-            "plos.org",
-            "frontiersin.org",
-            "mdpi.com",
-            "springer.com",
-            "wiley.com",
-            "cell.com",
-        ]
-
-        response = client.search(
+        # Only the rows and snippets rendered below are requested: raw page
+        # content, answers and images would dominate the response size.
+        # The client is synchronous, so it runs in a thread to keep the loop free.
+        response = await asyncio.to_thread(
+            client.search,
             query=enhanced_query,
             max_results=max_results,
             search_depth="advanced",
-            include_domains=include_domains,
+            include_domains=SCHOLARLY_DOMAINS,
+            include_raw_content=False,
+            include_answer=False,
+            include_images=False,
         )
 
         results = response.get("results", [])
-        pdf_urls = [r.get("url", "") for r in results if _is_pdf_url(r.get("url", ""))]
-
-        output_lines = [f"Found {len(results)} results for: {query}\n"]
-        if pdf_urls:
-            output_lines.append(f"PDF URLs found: {len(pdf_urls)}\n")
-
-        for i, result in enumerate(results, 1):
-            title = result.get("title", "No title")
-            url = result.get("url", "")
-            content = result.get("content", "")[:200]
-            is_pdf = "📄 [PDF]" if url in pdf_urls else ""
-            output_lines.extend([f"\n{i}. {title} {is_pdf}", f"   URL: {url}", f"   {content}..."])
-
-        if pdf_urls:
-            output_lines.append("\n\nPDF URLs for download:")
-            output_lines.extend(f"  - {url}" for url in pdf_urls)
-
-        return {"content": [{"type": "text", "text": "\n".join(output_lines)}]}
+        text = "\n".join(_format_web_results(query, results))
+        _cache_search(cache_key, text)
+        return {"content": [{"type": "text", "text": text}]}
 
     except Exception as e:
         return {"content": [{"type": "text", "text": f"Search error: {str(e)}"}], "is_error": True}
@@ -169,6 +307,47 @@ web_search = tool(
 # =============================================================================
 
 
+# arXiv's API returns at most this many entries per request
+ARXIV_MAX_PAGE_SIZE = 100
+
+
+@functools.lru_cache(maxsize=8)
+def _get_arxiv_client(page_size: int) -> "arxiv.Client":
+    """Shared arxiv.Client per page size: reuses its HTTP session and paces requests."""
+    return _lazy("arxiv").Client(page_size=page_size)
+
+
+def _format_arxiv_results(query: str, results: list):
+    """Yield the lines of arxiv_search's output for a list of arxiv.Result."""
+    yield f"Found {len(results)} ArXiv papers for: {query}\n"
+    yield "=" * 60
+
+    for i, paper in enumerate(results, 1):
+        # Format authors (limit to first 3)
+        authors = [a.name for a in paper.authors[:3]]
+        if len(paper.authors) > 3:
+            authors.append(f"et al. (+{len(paper.authors) - 3} more)")
+
+        # Truncate abstract
+        abstract = paper.summary.replace("\n", " ")[:300]
+        if len(paper.summary) > 300:
+            abstract += "..."
+
+        yield f"\n{i}. {paper.title}"
+        yield f"   Authors: {', '.join(authors)}"
+        yield f"   ArXiv ID: {paper.entry_id.split('/')[-1]}"
+        yield f"   Categories: {', '.join(paper.categories[:3])}"
+        yield f"   Published: {paper.published.strftime('%Y-%m-%d')}"
+        # ArXiv always has PDFs
+        yield f"   📄 PDF: {paper.pdf_url}"
+        yield f"   Abstract: {abstract}"
+
+    # Add summary of PDF URLs for easy downloading
+    yield "\n" + "=" * 60
+    yield "\n📥 PDF URLs for download:"
+    yield from (f"  - {paper.pdf_url}" for paper in results)
+
+
 async def _arxiv_search_impl(args: dict) -> dict:
     """Search ArXiv for academic papers."""
     query = args["query"]
@@ -176,7 +355,14 @@ async def _arxiv_search_impl(args: dict) -> dict:
     sort_by = args.get("sort_by", "relevance")
     category = args.get("category", None)
 
+    cache_key = ("arxiv", query, max_results, sort_by, category)
+    cached = _get_cached_search(cache_key)
+    if cached is not None:
+        return {"content": [{"type": "text", "text": cached}]}
+
     try:
+        arxiv = _lazy("arxiv")
+
         # Build search query
         search_query = query
         if category:
@@ -189,8 +375,8 @@ async def _arxiv_search_impl(args: dict) -> dict:
         elif sort_by == "citations":
             sort_criterion = arxiv.SortCriterion.Relevance  # ArXiv doesn't have citation sort
 
-        # Create search client
-        client = arxiv.Client()
+        # Fetch the whole result set in one request where arXiv allows it
+        client = _get_arxiv_client(max(1, min(max_results, ARXIV_MAX_PAGE_SIZE)))
         search = arxiv.Search(
             query=search_query,
             max_results=max_results,
@@ -198,72 +384,15 @@ async def _arxiv_search_impl(args: dict) -> dict:
             sort_order=arxiv.SortOrder.Descending,
         )
 
-        # Fetch results
-        results = list(client.results(search))
+        # Fetch results (blocking HTTP, so off the event loop)
+        results = await asyncio.to_thread(lambda: list(client.results(search)))
 
         if not results:
             return {"content": [{"type": "text", "text": f"No ArXiv papers found for: {query}"}]}
 
-        output_lines = [
-            f"Found {len(results)} ArXiv papers for: {query}\n",
-            "=" * 60,
-        ]
-
-        paper_data = []
-        for i, paper in enumerate(results, 1):
-            # Get PDF URL (ArXiv always has PDFs)
-            pdf_url = paper.pdf_url
-
-            # Format authors (limit to first 3)
-            authors = [a.name for a in paper.authors[:3]]
-            if len(paper.authors) > 3:
-                authors.append(f"et al. (+{len(paper.authors) - 3} more)")
-            authors_str = ", ".join(authors)
-
-            # Format categories
-            categories = ", ".join(paper.categories[:3])
-
-            # Format date
-            pub_date = paper.published.strftime("%Y-%m-%d")
-
-            # Truncate abstract
-            abstract = paper.summary.replace("\n", " ")[:300]
-            if len(paper.summary) > 300:
-                abstract += "..."
-
-            paper_info = {
-                "title": paper.title,
-                "authors": authors_str,
-                "pdf_url": pdf_url,
-                "arxiv_id": paper.entry_id.split("/")[-1],
-                "categories": categories,
-                "published": pub_date,
-            }
-            paper_data.append(paper_info)
-
-            output_lines.extend(
-                [
-                    f"\n{i}. {paper.title}",
-                    f"   Authors: {authors_str}",
-                    f"   ArXiv ID: {paper_info['arxiv_id']}",
-                    f"   Categories: {categories}",
-                    f"   Published: {pub_date}",
-                    f"   📄 PDF: {pdf_url}",
-                    f"   Abstract: {abstract}",
-                ]
-            )
-
-        # Add summary of PDF URLs for easy downloading
-        output_lines.extend(
-            [
-                "\n" + "=" * 60,
-                "\n📥 PDF URLs for download:",
-            ]
-        )
-        for paper in paper_data:
-            output_lines.append(f"  - {paper['pdf_url']}")
-
-        return {"content": [{"type": "text", "text": "\n".join(output_lines)}]}
+        text = "\n".join(_format_arxiv_results(query, results))
+        _cache_search(cache_key, text)
+        return {"content": [{"type": "text", "text": text}]}
 
     except Exception as e:
         return {
@@ -306,6 +435,11 @@ arxiv_search = tool(
 # =============================================================================
 
 
+# Characters that are invalid in filenames on Windows (and "/" everywhere)
+INVALID_FILENAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*', "_"))
+
+
+@functools.lru_cache(maxsize=512)
 def _extract_filename_from_url(url: str) -> str:
     """Extract a filename from URL."""
     parsed = urlparse(url)
@@ -317,18 +451,19 @@ def _extract_filename_from_url(url: str) -> str:
         if parts:
             filename = f"{parts[-1]}.pdf"
         else:
-            import hashlib
-
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+            url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
             filename = f"{parsed.netloc}_{url_hash}.pdf"
 
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, "_")
-    return filename[:200]
+    return filename[:200].translate(INVALID_FILENAME_CHARS)
+
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+# Multiplex downloads from one host over a single connection when h2 is installed
+DOWNLOAD_HTTP2 = importlib.util.find_spec("h2") is not None
 
-async def _download_single_pdf(url: str, output_dir: str) -> dict:
+
+async def _download_single_pdf(url: str, output_dir: str, client: httpx.AsyncClient) -> dict:
     """Download a single PDF file."""
     filename = _extract_filename_from_url(url)
     filepath = os.path.join(output_dir, filename)
@@ -342,36 +477,43 @@ async def _download_single_pdf(url: str, output_dir: str) -> dict:
             "skipped": True,
         }
 
+    # Stream into a .part file so memory stays at one chunk and an interrupted
+    # download is never mistaken for a finished one; the name is unique per
+    # download, so concurrent writers to one target never share it
+    part_path = None
     try:
-        async with httpx.AsyncClient(
-            timeout=60,
-            follow_redirects=True,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
-        ) as client:
-            response = await client.get(url)
+        async with client.stream("GET", url) as response:
             response.raise_for_status()
 
             content_type = response.headers.get("content-type", "").lower()
-            if "pdf" not in content_type and not url.lower().endswith(".pdf"):
-                if response.content[:4] != b"%PDF":
-                    return {
-                        "success": False,
-                        "url": url,
-                        "filename": filename,
-                        "error": "Not a PDF",
-                    }
-
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-
-            return {
-                "success": True,
-                "url": url,
-                "filepath": filepath,
-                "filename": filename,
-                "file_size_bytes": len(response.content),
-                "file_size_mb": round(len(response.content) / (1024 * 1024), 2),
-            }
+            sniff = "pdf" not in content_type and not url.lower().endswith(".pdf")
+            size = 0
+            fd, part_path = tempfile.mkstemp(dir=output_dir, prefix=f"{filename}.", suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    if sniff and not size and chunk[:4] != b"%PDF":
+                        return {
+                            "success": False,
+                            "url": url,
+                            "filename": filename,
+                            "error": "Not a PDF",
+                        }
+                    f.write(chunk)
+                    size += len(chunk)
+
+        if sniff and not size:
+            # An empty body never reaches the magic-byte check above
+            return {"success": False, "url": url, "filename": filename, "error": "Not a PDF"}
+
+        os.replace(part_path, filepath)
+        return {
+            "success": True,
+            "url": url,
+            "filepath": filepath,
+            "filename": filename,
+            "file_size_bytes": size,
+            "file_size_mb": round(size / (1024 * 1024), 2),
+        }
 
     except httpx.TimeoutException:
         return {"success": False, "url": url, "filename": filename, "error": "Timeout"}
@@ -384,24 +526,52 @@ async def _download_single_pdf(url: str, output_dir: str) -> dict:
         }
     except Exception as e:
         return {"success": False, "url": url, "filename": filename, "error": str(e)}
+    finally:
+        if part_path is not None:
+            try:
+                os.remove(part_path)  # Only still there if the download didn't complete
+            except FileNotFoundError:
+                pass
 
 
 async def _download_pdfs_impl(args: dict) -> dict:
     """Download PDFs to the session's pdfs folder."""
-    urls = args["urls"]
+    # URLs that save to the same file (repeats, http/https or ".pdf" variants) would
+    # race on it, so each file gets one task that tries its URLs in turn; earlier
+    # batches are covered by the already-exists check on the downloaded file
+    groups: dict[str, list[str]] = {}
+    for url in dict.fromkeys(url.strip() for url in args["urls"]):
+        groups.setdefault(_extract_filename_from_url(url), []).append(url)
     output_dir = ResearchConfig.get_pdfs_dir()
 
-    if not urls:
+    if not groups:
         return {"content": [{"type": "text", "text": "No URLs provided"}]}
 
     os.makedirs(output_dir, exist_ok=True)
 
-    results = []
+    concurrency = ResearchConfig.get_download_concurrency()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # One client for the whole batch, so connections to the same host are reused
+    async with httpx.AsyncClient(
+        timeout=60,
+        follow_redirects=True,
+        headers=DOWNLOAD_HEADERS,
+        http2=DOWNLOAD_HTTP2,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        async def download(urls: list[str]) -> dict:
+            async with semaphore:
+                for url in urls:
+                    result = await _download_single_pdf(url, output_dir, client)
+                    if result["success"]:
+                        break
+                return result
+
+        results = await asyncio.gather(*(download(urls) for urls in groups.values()))
     successful, failed, skipped = 0, 0, 0
 
-    for url in urls:
-        result = await _download_single_pdf(url, output_dir)
-        results.append(result)
+    for result in results:
         if result["success"]:
             skipped += 1 if result.get("skipped") else 0
             successful += 0 if result.get("skipped") else 1
@@ -410,7 +580,7 @@ async def _download_pdfs_impl(args: dict) -> dict:
 
     output_lines = [
         "Download Summary:",
-        f"  Total: {len(urls)}, Successful: {successful}, Failed: {failed}, Skipped: {skipped}",
+        f"  Total: {len(results)}, Successful: {successful}, Failed: {failed}, Skipped: {skipped}",
         f"  Output folder: {output_dir}/",
         "",
         "Details:",
@@ -453,6 +623,120 @@ download_pdfs = tool(
 # =============================================================================
 
 
+@functools.lru_cache(maxsize=1)
+def _get_pdf_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Worker processes for text extraction: CPU-bound, and PDFium is not thread-safe.
+
+    Workers are never forked from this (multi-threaded) process, which could deadlock
+    them on locks held by other threads; forkserver is used, or spawn where unavailable.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    start_method = "forkserver" if "forkserver" in methods else "spawn"
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(start_method)
+    )
+
+
+# Pages handed to one worker process at a time; larger PDFs are split across workers
+PDF_PAGES_PER_TASK = 8
+
+
+def _extract_pdf_pages(filepath: str, start: int, stop: int) -> tuple[list[str], int]:
+    """Extract text from pages [start, stop) of a PDF (clamped to its length).
+
+    Returns the non-empty pages, formatted with their page numbers, and the page count.
+    """
+    extracted_text = []
+    pdf = _lazy("pdfium").PdfDocument(filepath)
+    try:
+        total_pages = len(pdf)
+        for i in range(start, min(stop, total_pages)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            # PDFium separates lines with CRLF
+            text = textpage.get_text_range().replace("\r\n", "\n").strip()
+            textpage.close()
+            page.close()
+            if text:
+                extracted_text.append(f"--- Page {i + 1} ---\n{text}")
+    finally:
+        pdf.close()
+    return extracted_text, total_pages
+
+
+# read_pdf returns at most this many characters of page text
+PDF_TEXT_LIMIT = 50000
+
+
+async def _extract_pdf_text(
+    filepath: str, max_pages: int | None, char_limit: int = PDF_TEXT_LIMIT
+) -> tuple[list[str], int]:
+    """Extract per-page text from a PDF in the worker pool; returns the non-empty pages
+    and the page count.
+
+    The first batch of pages also reports the page count; the remaining pages are
+    extracted in waves of parallel batches (one per CPU), stopping once more than
+    char_limit characters have been collected since the rest would be truncated.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pdf_executor()
+    first_stop = min(PDF_PAGES_PER_TASK, max_pages) if max_pages else PDF_PAGES_PER_TASK
+    extracted_text, total_pages = await loop.run_in_executor(
+        pool, _extract_pdf_pages, filepath, 0, first_stop
+    )
+    # Pages are joined with a two-character separator
+    extracted_chars = sum(len(page) + 2 for page in extracted_text)
+
+    pages_to_read = min(total_pages, max_pages) if max_pages else total_pages
+    starts = range(first_stop, pages_to_read, PDF_PAGES_PER_TASK)
+    wave_size = os.cpu_count() or 1
+    for wave in range(0, len(starts), wave_size):
+        if extracted_chars > char_limit:
+            break
+        batches = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool,
+                    _extract_pdf_pages,
+                    filepath,
+                    start,
+                    min(start + PDF_PAGES_PER_TASK, pages_to_read),
+                )
+                for start in starts[wave : wave + wave_size]
+            )
+        )
+        for pages, _ in batches:
+            extracted_text.extend(pages)
+            extracted_chars += sum(len(page) + 2 for page in pages)
+    return extracted_text, total_pages
+
+
+# Extracted text is cached next to the PDFs (in a hidden folder the session
+# listings skip), so re-reading a paper skips extraction entirely
+PDF_TEXT_CACHE_DIR = ".cache"
+
+
+def _pdf_text_cache_path(filepath: str, stat: os.stat_result, max_pages: int | None) -> str:
+    """Cache file for a PDF's read_pdf output; the name changes whenever the PDF does."""
+    key = hashlib.blake2b(
+        f"{stat.st_size}:{stat.st_mtime_ns}:{max_pages}".encode(), digest_size=16
+    ).hexdigest()
+    folder, name = os.path.split(filepath)
+    return os.path.join(folder, PDF_TEXT_CACHE_DIR, f"{name}.{key}.txt")
+
+
+def _store_pdf_text(cache_path: str, text: str):
+    """Write a cache entry atomically; caching is best-effort, so failures are ignored."""
+    part_path = f"{cache_path}.part"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(part_path, "wb") as f:
+            f.write(text.encode("utf-8"))
+        os.replace(part_path, cache_path)
+    except OSError:
+        pass
+
+
 async def _read_pdf_impl(args: dict) -> dict:
     """Extract text from a PDF in the session's pdfs folder."""
     filename = args["filename"]
@@ -463,22 +747,23 @@ async def _read_pdf_impl(args: dict) -> dict:
 
     filepath = os.path.join(ResearchConfig.get_pdfs_dir(), filename)
 
-    if not os.path.exists(filepath):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
         return {
             "content": [{"type": "text", "text": f"Error: '{filename}' not found"}],
             "is_error": True,
         }
 
+    cache_path = _pdf_text_cache_path(filepath, stat, max_pages)
     try:
-        extracted_text = []
-        with pdfplumber.open(filepath) as pdf:
-            total_pages = len(pdf.pages)
-            pages_to_read = min(total_pages, max_pages) if max_pages else total_pages
+        with open(cache_path, "rb") as f:
+            return {"content": [{"type": "text", "text": f.read().decode("utf-8")}]}
+    except FileNotFoundError:
+        pass
 
-            for i, page in enumerate(pdf.pages[:pages_to_read]):
-                text = page.extract_text()
-                if text:
-                    extracted_text.append(f"--- Page {i + 1} ---\n{text}")
+    try:
+        extracted_text, total_pages = await _extract_pdf_text(filepath, max_pages)
 
         if not extracted_text:
             return {
@@ -488,19 +773,17 @@ async def _read_pdf_impl(args: dict) -> dict:
             }
 
         full_text = "\n\n".join(extracted_text)
-        if len(full_text) > 50000:
-            full_text = full_text[:50000] + "\n\n[... Truncated ...]"
+        if len(full_text) > PDF_TEXT_LIMIT:
+            full_text = full_text[:PDF_TEXT_LIMIT] + "\n\n[... Truncated ...]"
 
-        return {
-            "content": [
-                {
-                    "type": "text",
-                    "text": f"PDF: {filename}\nPages: {len(extracted_text)}/{total_pages}\n\n{full_text}",
-                }
-            ]
-        }
+        text = f"PDF: {filename}\nPages: {len(extracted_text)}/{total_pages}\n\n{full_text}"
+        _store_pdf_text(cache_path, text)
+        return {"content": [{"type": "text", "text": text}]}
 
     except Exception as e:
+        if isinstance(e, concurrent.futures.BrokenExecutor):
+            # A worker died (e.g. on a malformed PDF); start a fresh pool next time
+            _get_pdf_executor.cache_clear()
         return {
             "content": [{"type": "text", "text": f"Error reading '{filename}': {str(e)}"}],
             "is_error": True,
@@ -526,6 +809,109 @@ read_pdf = tool(
 # =============================================================================
 
 
+# Notes are appended to one JSON Lines file per session; sessions saved before
+# that keep one .json file per note, which read_notes still picks up
+NOTES_FILENAME = "notes.jsonl"
+
+
+def _dump_note(note: dict) -> bytes:
+    """Serialize a note as one line of UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(note) + b"\n"
+    return json.dumps(note, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+# O_BINARY keeps Windows from translating newlines on the raw descriptor
+NOTES_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+
+# O_APPEND alone doesn't keep concurrent lines whole (not on Windows, nor across
+# the retries of a partial write), so appends to one file are serialized
+_append_locks: dict[str, threading.Lock] = {}
+_append_locks_guard = threading.Lock()
+
+
+def _append_line(filepath: str, line: bytes):
+    """Append a line to a file with a raw O_APPEND write, bypassing the io stack."""
+    with _append_locks_guard:
+        lock = _append_locks.setdefault(os.path.abspath(filepath), threading.Lock())
+    with lock:
+        fd = os.open(filepath, NOTES_OPEN_FLAGS, 0o644)
+        try:
+            view = memoryview(line)
+            while view:
+                view = view[os.write(fd, view) :]
+        finally:
+            os.close(fd)
+
+
+def _legacy_note_paths(notes_dir: str, name_marker: str = "") -> list[str]:
+    """Sorted paths of a notes folder's per-note .json files whose names contain name_marker."""
+    with os.scandir(notes_dir) as it:
+        return sorted(
+            e.path
+            for e in it
+            if e.name.endswith(".json") and name_marker in e.name and e.is_file()
+        )
+
+
+def load_notes(
+    notes_dir: str,
+    note_type: str | None = None,
+    on_error: Callable[[str, Exception], dict | None] | None = None,
+) -> list[dict]:
+    """Parse every note (or only those of note_type) in a session's notes folder, oldest first.
+
+    With a note_type, files and lines that cannot hold a matching note are skipped
+    before parsing: legacy filenames embed the type and JSON lines contain it verbatim.
+    A note that fails to parse raises, unless on_error is given: it is then called with
+    a label for the note ("name.json" or "notes.jsonl:<line>") and the error, and
+    returns a note to stand in for it, or None to skip it.
+    Raises FileNotFoundError if the folder does not exist.
+    """
+    loads = (orjson or json).loads
+
+    def parse(data: bytes, label: str) -> dict | None:
+        if on_error is None:
+            return loads(data)
+        try:
+            return loads(data)
+        except Exception as e:
+            return on_error(label, e)
+
+    notes = []
+    for path in _legacy_note_paths(notes_dir, f"_{note_type}_" if note_type else ""):
+        with open(path, "rb") as f:
+            notes.append(parse(f.read(), os.path.basename(path)))
+    line_marker = json.dumps(note_type, ensure_ascii=False).encode("utf-8") if note_type else b""
+    try:
+        with open(os.path.join(notes_dir, NOTES_FILENAME), "rb") as f:
+            notes.extend(
+                parse(line, f"{NOTES_FILENAME}:{i}")
+                for i, line in enumerate(f, 1)
+                if line_marker in line and line.strip()
+            )
+    except FileNotFoundError:
+        pass
+    if note_type:
+        return [note for note in notes if note is not None and note.get("type") == note_type]
+    return [note for note in notes if note is not None]
+
+
+def count_notes(notes_dir: str) -> int:
+    """Number of notes in a session's notes folder (0 if it does not exist), without parsing."""
+    try:
+        count = len(_legacy_note_paths(notes_dir))
+    except FileNotFoundError:
+        return 0
+    try:
+        with open(os.path.join(notes_dir, NOTES_FILENAME), "rb") as f:
+            count += sum(1 for line in f if line.strip())
+    except FileNotFoundError:
+        pass
+    return count
+
+
 async def _save_note_impl(args: dict) -> dict:
     """Save a research note to the session's notes folder."""
     note_type = args["note_type"]
@@ -546,14 +932,11 @@ async def _save_note_impl(args: dict) -> dict:
         "timestamp": datetime.now().isoformat(),
     }
 
-    safe_title = "".join(c if c.isalnum() or c in " -_" else "_" for c in title)[:50]
-    filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{note_type}_{safe_title}.json"
-    filepath = os.path.join(notes_dir, filename)
+    filepath = os.path.join(notes_dir, NOTES_FILENAME)
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(note, f, indent=2, ensure_ascii=False)
-        return {"content": [{"type": "text", "text": f"Note saved: {filename}"}]}
+        _append_line(filepath, _dump_note(note))
+        return {"content": [{"type": "text", "text": f"Note saved: [{note_type}] {title}"}]}
     except Exception as e:
         return {"content": [{"type": "text", "text": f"Error: {str(e)}"}], "is_error": True}
 
@@ -583,29 +966,33 @@ async def _read_notes_impl(args: dict) -> dict:
     note_type_filter = args.get("note_type", "all")
     notes_dir = ResearchConfig.get_notes_dir()
 
-    if not os.path.exists(notes_dir):
+    try:
+        notes = load_notes(notes_dir, None if note_type_filter == "all" else note_type_filter)
+    except FileNotFoundError:
         return {"content": [{"type": "text", "text": "No notes found."}]}
 
-    notes = []
-    for filename in sorted(os.listdir(notes_dir)):
-        if not filename.endswith(".json"):
-            continue
-        with open(os.path.join(notes_dir, filename), "r", encoding="utf-8") as f:
-            note = json.load(f)
-        if note_type_filter == "all" or note.get("type") == note_type_filter:
-            notes.append(note)
-
-    if not notes:
+    # Keep only the rendered fields, column by column
+    types, titles, sources, contents = [], [], [], []
+    for note in notes:
+        types.append(note["type"].upper())
+        titles.append(note["title"])
+        sources.append(note.get("source", "N/A"))
+        contents.append(note["content"])
+
+    if not titles:
         return {"content": [{"type": "text", "text": "No matching notes found."}]}
 
-    output_lines = [f"Found {len(notes)} notes:\n"]
-    for i, note in enumerate(notes, 1):
+    separator = "=" * 60
+    output_lines = [f"Found {len(titles)} notes:\n"]
+    for i, (note_type, title, source, content) in enumerate(
+        zip(types, titles, sources, contents), 1
+    ):
         output_lines.extend(
             [
-                f"\n{'='*60}",
-                f"Note {i}: [{note['type'].upper()}] {note['title']}",
-                f"Source: {note.get('source', 'N/A')}",
-                f"\n{note['content']}",
+                f"\n{separator}",
+                f"Note {i}: [{note_type}] {title}",
+                f"Source: {source}",
+                f"\n{content}",
             ]
         )
 
@@ -688,8 +1075,9 @@ async def _write_report_impl(args: dict) -> dict:
     filepath = os.path.join(output_dir, filename)
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(report_content)
+        # Encode once and hand the whole report to a single write
+        with open(filepath, "wb") as f:
+            f.write(report_content.encode("utf-8"))
         return {
             "content": [{"type": "text", "text": f"Report saved: {filepath}\n\n{report_content}"}]
         }
@@ -715,6 +1103,44 @@ write_report = tool(
 )(_write_report_impl)
 
 
+# =============================================================================
+# Multi Search Tool
+# =============================================================================
+
+
+async def _multi_search_impl(args: dict) -> dict:
+    """Run a web search and an ArXiv search for the same query concurrently."""
+    query = args["query"]
+    max_results = args.get("max_results", 10)
+
+    web_result, arxiv_result = await asyncio.gather(
+        _web_search_impl({"query": query, "max_results": max_results}),
+        _arxiv_search_impl({"query": query, "max_results": max_results}),
+    )
+
+    result = {"content": web_result["content"] + arxiv_result["content"]}
+    if web_result.get("is_error") and arxiv_result.get("is_error"):
+        result["is_error"] = True
+    return result
+
+
+multi_search = tool(
+    name="multi_search",
+    description="Search the web and ArXiv for the same query at once; returns both result lists.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "The search query"},
+            "max_results": {
+                "type": "integer",
+                "description": "Maximum results per source (default: 10)",
+            },
+        },
+        "required": ["query"],
+    },
+)(_multi_search_impl)
+
+
 # =============================================================================
 # Create MCP Server
 # =============================================================================
@@ -725,6 +1151,7 @@ web_research_tools_server = create_sdk_mcp_server(
     tools=[
         web_search,
         arxiv_search,
+        multi_search,
         download_pdfs,
         read_pdf,
         save_note,